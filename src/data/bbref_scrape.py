@@ -12,6 +12,8 @@ import numpy as np
 import datetime
 import dateparser
 import time
+from src.data import innings
+from src.data import validate
 class BoxScore(object):
     """Represents a box score from baseball reference.
     
@@ -85,6 +87,7 @@ class BoxScoreScraper(object):
 
         # Create boxScore object to be populated
         self.box_score = BoxScore()
+        self.box_score.url = self.url
 
         # Scrape scorebox
         self.scrape_scorebox()
@@ -110,8 +113,15 @@ class BoxScoreScraper(object):
         away_team = teams[0].text
         home_team = teams[1].text
         scorebox_divs = scorebox.find_all('div')
-        away_record = scorebox_divs[5].text.split('-')
-        home_record = scorebox_divs[12].text.split('-')
+        record = re.compile(r'^\d+-\d+$')
+        records = [scorebox_divs[5].text.strip(), scorebox_divs[12].text.strip()] if len(scorebox_divs) > 12 else []
+        if len(records) != 2 or not all(record.match(text) for text in records):
+            # Records are not in their usual positions so fall back to the first two W-L looking divs
+            records = [div.text.strip() for div in scorebox_divs if record.match(div.text.strip())][:2]
+            if len(records) != 2:
+                raise Exception('Could not find team records in scorebox of ' + self.url)
+        away_record = records[0].split('-')
+        home_record = records[1].split('-')
 
         # Get meta information
         scorebox_meta = scorebox.find('div', {'class' : 'scorebox_meta'}).find_all('div')
@@ -144,7 +154,8 @@ class BoxScoreScraper(object):
         df = df.drop(df.columns[0], axis=1)
         df = df.truncate(after=1, axis='rows')
         df.rename(columns = {df.columns[0] : 'Team'}, inplace=True)
-        df[df.columns[1:]] = df[df.columns[1:]].replace('X', None).astype('int')
+        # An X marks a bottom half inning that was not played, keep it as NaN rather than forcing it to an int
+        df[df.columns[1:]] = df[df.columns[1:]].replace('X', np.nan).apply(pd.to_numeric)
         self.box_score.set_linescore(df)
 
     def scrape_batting(self, team):
@@ -153,6 +164,8 @@ class BoxScoreScraper(object):
         
         # Get data, read to dataframe, clean/renaming some columns for readability
         batting = self.content.find('table', id=team.replace(' ', '').replace('.', '') + 'batting')
+        if batting is None:
+            raise Exception('No batting table for ' + team + ' in ' + self.url)
         df = pd.read_html(batting.prettify(), flavor='lxml')[0]
         df.rename(columns={'Batting' : 'Player'}, inplace=True)
         df.dropna(subset=['Player'], inplace=True)
@@ -172,6 +185,8 @@ class BoxScoreScraper(object):
         
         # Get data, read to dataframe, clean/renaming some columns for readability
         pitching = self.content.find('table', id=team.replace(' ', '').replace('.', '') + 'pitching')
+        if pitching is None:
+            raise Exception('No pitching table for ' + team + ' in ' + self.url)
         df = pd.read_html(pitching.prettify(), flavor='lxml')[0]
         df.rename(columns= {'Pitching' : 'Player'}, inplace=True)
 
@@ -258,7 +273,7 @@ def get_box_score_links(team, first_date, last_date):
                         
     return links.drop_duplicates()
 
-def get_box_scores(links):
+def get_box_scores(links, quarantine=None):
     """ 
     Scrapes box scores from set of provided links.
   
@@ -266,6 +281,8 @@ def get_box_scores(links):
   
     Parameters: 
     links (DataFrame) : DataFrame with two columns, "Date" and "URL"
+    quarantine (list) : if given, games that fail to scrape are recorded here as dictionaries with
+        URL, Stage and Error keys and skipped instead of stopping the run
     Returns: 
     List of boxscore objects for all the requested games.
 
@@ -276,13 +293,27 @@ def get_box_scores(links):
         time.sleep(2)
         print('Scraping ' + row[1], end='\r')
         scraper = BoxScoreScraper(row[1])
-        scraper.scrape_box_score()
+        try:
+            scraper.scrape_box_score()
+        except Exception as e:
+            if quarantine is None:
+                raise
+            quarantine.append({'URL' : row[1], 'Stage' : 'scrape', 'Error' : repr(e)})
+            continue
         box_scores.append(scraper.box_score)
 
     return box_scores
 
 
-def parse_box_scores(scores):
+def stack_frames(frames, columns):
+    """Concatenates per-game DataFrames in one pass with columns first and any extra columns after them."""
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    stacked = pd.concat(frames, ignore_index=True)
+    return stacked.reindex(columns=columns + [col for col in stacked.columns if col not in columns])
+
+
+def parse_box_scores(scores, quarantine=None):
     """ 
     Converts list of boxscore objects into aggregate datasets.
   
@@ -290,214 +321,243 @@ def parse_box_scores(scores):
   
     Parameters: 
     scores (List of BoxScore object) : List of boxscores to be included in output datasets.
+    quarantine (list) : if given, box scores that are missing data or fail to parse are recorded here as dictionaries
+        with URL, Stage and Error keys and skipped instead of stopping the run
 
     Returns: 
-    DataFrames of game-by-game, game-level, batter-level, pitcher-level data.
+    DataFrames of game-by-game, game-level, batter-level, pitcher-level data and an InningStore with
+    the runs for every inning, including extra innings.
     """
 
-    # Predefine output dataframes
-    game_level = pd.DataFrame(columns=['GameID', 'AwayTeam', 'HomeTeam', 'DateTime' , 'Attendance', 'Venue', 'Duration', 'Details',
-                                        'AwayScore', 'HomeScore'])
+    # Predefine output columns, rows are collected per game and each table is built once at the end
+    game_cols = ['GameID', 'AwayTeam', 'HomeTeam', 'DateTime' , 'Attendance', 'Venue', 'Duration', 'Details',
+                                        'AwayScore', 'HomeScore', 'URL']
 
-    team_level = pd.DataFrame(columns=['GameID', 'Team', 'GameNum', 'Wins', 'Losses', 'HomeAway', 
+    team_cols = ['GameID', 'Team', 'GameNum', 'Wins', 'Losses', 'HomeAway', 
                                         'Inn1', 'Inn2', 'Inn3', 'Inn4', 'Inn5', 'Inn6', 'Inn7', 'Inn8', 'Inn9', 
                                         'Runs', 'Hits', 'Errors', 'AB', 'R', 'H', 'RBI', 'BB', 'SO', 'PA', 'BA', 'OBP', 'SLG', 'OPS', 'Pit', 'Str', 'WPA', 'aLI', 'WPA+', 'WPA-', 'RE24', 'PO', 'A',
-                                        'Starter', 'IP', 'H_P', 'R_P', 'ER', 'BB_P', 'SO_P', 'HR_P', 'ERA', 'BF', 'Pit_P', 'Str_P', 'Ctct', 'StS', 'StL', 'GB', 'FB', 'LD', 'Unk', 'GSc', 'IR', 'IS', 'WPA_P', 'aLI_P', 'RE24_P'])
+                                        'Starter', 'IP', 'H_P', 'R_P', 'ER', 'BB_P', 'SO_P', 'HR_P', 'ERA', 'BF', 'Pit_P', 'Str_P', 'Ctct', 'StS', 'StL', 'GB', 'FB', 'LD', 'Unk', 'GSc', 'IR', 'IS', 'WPA_P', 'aLI_P', 'RE24_P',
+                                        'Opponent', 'GameNumOpponent']
+
+    batter_cols = ['GameID', 'Player', 'Team', 'HomeAway', 'Position', 'AB', 'R', 'H', 'RBI', 'BB', 'SO', 'PA', 'BA',                                             'OBP', 'SLG', 'OPS', 'Pit', 'Str', 'WPA', 'aLI', 'WPA+', 'WPA-', 'RE24', 'PO', 'A', 'Details']
 
-    batter_level = pd.DataFrame(columns=['GameID', 'Player', 'Team', 'HomeAway', 'Position', 'AB', 'R', 'H', 'RBI', 'BB', 'SO', 'PA', 'BA',                                             'OBP', 'SLG', 'OPS', 'Pit', 'Str', 'WPA', 'aLI', 'WPA+', 'WPA-', 'RE24', 'PO', 'A', 'Details'])
+    pitcher_cols = ['GameID', 'Player', 'Team', 'HomeAway', 'Starter', 'Details', 'IP', 'H', 'R', 'ER', 'BB', 'SO', 'HR',                                        'ERA', 'BF', 'Pit', 'Str', 'Ctct', 'StS', 'StL', 'GB', 'FB', 'LD', 'Unk', 'GSc', 'IR', 'IS', 'WPA',
+                                            'aLI', 'RE24']
 
-    pitcher_level = pd.DataFrame(columns=['GameID', 'Player', 'Team', 'HomeAway', 'Starter', 'Details', 'IP', 'H', 'R', 'ER', 'BB', 'SO', 'HR',                                        'ERA', 'BF', 'Pit', 'Str', 'Ctct', 'StS', 'StL', 'GB', 'FB', 'LD', 'Unk', 'GSc', 'IR', 'IS', 'WPA',
-                                            'aLI', 'RE24'])
+    game_rows, team_rows, batter_frames, pitcher_frames = [], [], [], []
+    # Linescores are also kept whole so extra innings are not lost
+    game_ids = []
+    linescores = []
 
     # Iterate through all box scores
     for i, box_score in enumerate(scores): 
-        print(box_score.date)   
+        # Skip box scores that are missing the data we need rather than crashing part way through a game
+        problems = validate.check_box_score(box_score)
+        if problems:
+            if quarantine is None:
+                raise Exception('Box score ' + str(getattr(box_score, 'url', i)) + ' cannot be parsed: ' + '; '.join(problems))
+            quarantine.append({'URL' : getattr(box_score, 'url', np.nan), 'Stage' : 'parse', 'Error' : '; '.join(problems)})
+            continue
 
-        # Generate unique game id
-        game_id = hash(box_score.away_team + box_score.home_team + str(box_score.date) + str(box_score.time))
+        print(box_score.date)   
 
-        # Convert date and time to datetime object if it exists
-        
-        if isinstance(box_score.time, str):
-            new_datetime = dateparser.parse(box_score.date + ' ' + box_score.time.replace('Local', ''))
-        else:
-            new_datetime = dateparser.parse(box_score.date + ' 11:59 pm')
-        
-        # Populate row of game level dataframe
-        linescore = box_score.linescore
-        game_level = game_level.append({'GameID' : game_id,
-                            'AwayTeam' : box_score.away_team,
-                            'HomeTeam' : box_score.home_team,
-                            'DateTime' : new_datetime,
-                            'Attendance' : box_score.attendance,
-                            'Venue' : box_score.venue,
-                            'Duration' : box_score.duration,
-                            'Details' : box_score.time_place,
-                            'AwayScore' : linescore.loc[0, 'R'],
-                            'HomeScore' : linescore.loc[1, 'R']}, ignore_index=True)
-
-        # Populate team level dataframes
-        team_level = team_level.append({'GameID' : game_id,
-                                    'Team' : box_score.away_team,
-                                    'GameNum': int(box_score.away_wins) + int(box_score.away_losses), 
-                                    'Opponent' : box_score.home_team,
-                                    'GameNumOpponent': int(box_score.home_wins) + int(box_score.home_losses), 
-                                    'Wins' : box_score.away_wins, 
-                                    'Losses' : box_score.away_losses,
-                                    'HomeAway' : 'Away',
-                                    'Inn1' : (linescore.loc[0, '1'] if '1' in linescore.columns else np.nan),
-                                    'Inn2' : (linescore.loc[0, '2'] if '2' in linescore.columns else np.nan),
-                                    'Inn3' : (linescore.loc[0, '3'] if '3' in linescore.columns else np.nan),
-                                    'Inn4' : (linescore.loc[0, '4'] if '4' in linescore.columns else np.nan),
-                                    'Inn5' : (linescore.loc[0, '5'] if '5' in linescore.columns else np.nan),
-                                    'Inn6' : (linescore.loc[0, '6'] if '6' in linescore.columns else np.nan),
-                                    'Inn7' : (linescore.loc[0, '7'] if '7' in linescore.columns else np.nan),
-                                    'Inn8' : (linescore.loc[0, '8'] if '8' in linescore.columns else np.nan),
-                                    'Inn9' : (linescore.loc[0, '9'] if '9' in linescore.columns else np.nan),
-                                    'Runs' : linescore.loc[0, 'R'],
-                                    'Hits' : linescore.loc[0, 'H'],
-                                    'Errors' : linescore.loc[0, 'E'],
-                                    'AB' : box_score.away_batting.iloc[-1]['AB'], 
-                                    'R' : box_score.away_batting.iloc[-1]['R'], 
-                                    'RBI' : box_score.away_batting.iloc[-1]['RBI'], 
-                                    'BB': box_score.away_batting.iloc[-1]['BB'], 
-                                    'SO' : box_score.away_batting.iloc[-1]['SO'], 
-                                    'PA' : box_score.away_batting.iloc[-1]['PA'], 
-                                    'BA' : box_score.away_batting.iloc[-1]['BA'],
-                                    'OBP' : box_score.away_batting.iloc[-1]['OBP'], 
-                                    'SLG' : box_score.away_batting.iloc[-1]['SLG'], 
-                                    'OPS' : box_score.away_batting.iloc[-1]['OPS'], 
-                                    'Pit' : box_score.away_batting.iloc[-1]['Pit'], 
-                                    'Str' : box_score.away_batting.iloc[-1]['Str'], 
-                                    'WPA' : box_score.away_batting.iloc[-1]['WPA'], 
-                                    'aLI' : box_score.away_batting.iloc[-1]['aLI'], 
-                                    'WPA+' : box_score.away_batting.iloc[-1]['WPA+'], 
-                                    'WPA-' : box_score.away_batting.iloc[-1]['WPA-'], 
-                                    'RE24' : box_score.away_batting.iloc[-1]['RE24'],
-                                    'PO' : box_score.away_batting.iloc[-1]['PO'],
-                                    'A' : box_score.away_batting.iloc[-1]['A'],
-                                    'Starter' : box_score.away_pitching.iloc[0, 0],
-                                    'IP' : box_score.away_pitching.iloc[-1]['IP'], 
-                                    'H_P' : box_score.away_pitching.iloc[-1]['H'], 
-                                    'R_P' : box_score.away_pitching.iloc[-1]['R'], 
-                                    'ER' : box_score.away_pitching.iloc[-1]['ER'], 
-                                    'BB_P' : box_score.away_pitching.iloc[-1]['BB'], 
-                                    'SO_P' : box_score.away_pitching.iloc[-1]['SO'], 
-                                    'HR_P' : box_score.away_pitching.iloc[-1]['HR'], 
-                                    'ERA' : box_score.away_pitching.iloc[-1]['ERA'],
-                                    'BF' : box_score.away_pitching.iloc[-1]['BF'], 
-                                    'Pit_P' : box_score.away_pitching.iloc[-1]['Pit'], 
-                                    'Str_P' : box_score.away_pitching.iloc[-1]['Str'], 
-                                    'Ctct' : box_score.away_pitching.iloc[-1]['Ctct'], 
-                                    'StS' : box_score.away_pitching.iloc[-1]['StS'], 
-                                    'StL' : box_score.away_pitching.iloc[-1]['StL'] , 
-                                    'GB' : box_score.away_pitching.iloc[-1]['GB'], 
-                                    'FB' : box_score.away_pitching.iloc[-1]['FB'], 
-                                    'LD' : box_score.away_pitching.iloc[-1]['LD'], 
-                                    'Unk' : box_score.away_pitching.iloc[-1]['Unk'],
-                                    'GSc' : box_score.away_pitching.iloc[-1]['GSc'], 
-                                    'IR' : box_score.away_pitching.iloc[-1]['IR'], 
-                                    'IS' : box_score.away_pitching.iloc[-1]['IS'], 
-                                    'WPA_P' : box_score.away_pitching.iloc[-1]['WPA'], 
-                                    'aLI_P' : box_score.away_pitching.iloc[-1]['aLI'], 
-                                    'RE24_P' : box_score.away_pitching.iloc[-1]['RE24']}, ignore_index=True)
-        
-        team_level = team_level.append({'GameID' : game_id,
-                                    'Team' : box_score.home_team,
-                                    'GameNum': int(box_score.home_wins) + int(box_score.home_losses), 
-                                    'Opponent' : box_score.away_team,
-                                    'GameNumOpponent': int(box_score.away_wins) + int(box_score.away_losses), 
-                                    'Wins' : box_score.home_wins, 
-                                    'Losses' : box_score.home_losses,
-                                    'HomeAway' : 'Home',
-                                    'Inn1' : (linescore.loc[1, '1'] if '1' in linescore.columns else np.nan),
-                                    'Inn2' : (linescore.loc[1, '2'] if '2' in linescore.columns else np.nan),
-                                    'Inn3' : (linescore.loc[1, '3'] if '3' in linescore.columns else np.nan),
-                                    'Inn4' : (linescore.loc[1, '4'] if '4' in linescore.columns else np.nan),
-                                    'Inn5' : (linescore.loc[1, '5'] if '5' in linescore.columns else np.nan),
-                                    'Inn6' : (linescore.loc[1, '6'] if '6' in linescore.columns else np.nan),
-                                    'Inn7' : (linescore.loc[1, '7'] if '7' in linescore.columns else np.nan),
-                                    'Inn8' : (linescore.loc[1, '8'] if '8' in linescore.columns else np.nan),
-                                    'Inn9' : (linescore.loc[1, '9'] if '9' in linescore.columns else np.nan),
-                                    'Runs' : linescore.loc[1, 'R'],
-                                    'Hits' : linescore.loc[1, 'H'],
-                                    'Errors' : linescore.loc[1, 'E'],
-                                    'AB' : box_score.home_batting.iloc[-1]['AB'], 
-                                    'R' : box_score.home_batting.iloc[-1]['R'], 
-                                    'RBI' : box_score.home_batting.iloc[-1]['RBI'], 
-                                    'BB': box_score.home_batting.iloc[-1]['BB'], 
-                                    'SO' : box_score.home_batting.iloc[-1]['SO'], 
-                                    'PA' : box_score.home_batting.iloc[-1]['PA'], 
-                                    'BA' : box_score.home_batting.iloc[-1]['BA'],
-                                    'OBP' : box_score.home_batting.iloc[-1]['OBP'], 
-                                    'SLG' : box_score.home_batting.iloc[-1]['SLG'], 
-                                    'OPS' : box_score.home_batting.iloc[-1]['OPS'], 
-                                    'Pit' : box_score.home_batting.iloc[-1]['Pit'], 
-                                    'Str' : box_score.home_batting.iloc[-1]['Str'], 
-                                    'WPA' : box_score.home_batting.iloc[-1]['WPA'], 
-                                    'aLI' : box_score.home_batting.iloc[-1]['aLI'], 
-                                    'WPA+' : box_score.home_batting.iloc[-1]['WPA+'], 
-                                    'WPA-' : box_score.home_batting.iloc[-1]['WPA-'], 
-                                    'RE24' : box_score.home_batting.iloc[-1]['RE24'],
-                                    'PO' : box_score.home_batting.iloc[-1]['PO'],
-                                    'A' : box_score.home_batting.iloc[-1]['A'],
-                                    'Starter' : box_score.home_pitching.iloc[0, 0],
-                                    'IP' : box_score.home_pitching.iloc[-1]['IP'], 
-                                    'H_P' : box_score.home_pitching.iloc[-1]['H'], 
-                                    'R_P' : box_score.home_pitching.iloc[-1]['R'], 
-                                    'ER' : box_score.home_pitching.iloc[-1]['ER'], 
-                                    'BB_P' : box_score.home_pitching.iloc[-1]['BB'], 
-                                    'SO_P' : box_score.home_pitching.iloc[-1]['SO'], 
-                                    'HR_P' : box_score.home_pitching.iloc[-1]['HR'], 
-                                    'ERA' : box_score.home_pitching.iloc[-1]['ERA'],
-                                    'BF' : box_score.home_pitching.iloc[-1]['BF'], 
-                                    'Pit_P' : box_score.home_pitching.iloc[-1]['Pit'], 
-                                    'Str_P' : box_score.home_pitching.iloc[-1]['Str'], 
-                                    'Ctct' : box_score.home_pitching.iloc[-1]['Ctct'], 
-                                    'StS' : box_score.home_pitching.iloc[-1]['StS'], 
-                                    'StL' : box_score.home_pitching.iloc[-1]['StL'] , 
-                                    'GB' : box_score.home_pitching.iloc[-1]['GB'], 
-                                    'FB' : box_score.home_pitching.iloc[-1]['FB'], 
-                                    'LD' : box_score.home_pitching.iloc[-1]['LD'], 
-                                    'Unk' : box_score.home_pitching.iloc[-1]['Unk'],
-                                    'GSc' : box_score.home_pitching.iloc[-1]['GSc'], 
-                                    'IR' : box_score.home_pitching.iloc[-1]['IR'], 
-                                    'IS' : box_score.home_pitching.iloc[-1]['IS'], 
-                                    'WPA_P' : box_score.home_pitching.iloc[-1]['WPA'], 
-                                    'aLI_P' : box_score.home_pitching.iloc[-1]['aLI'], 
-                                    'RE24_P' : box_score.home_pitching.iloc[-1]['RE24']}, ignore_index=True)
-
-
-        # Populate batter level dataframes
-        away_batting_df = box_score.away_batting.iloc[:-1]
-        away_batting_df.insert(0, 'GameID', game_id)
-        away_batting_df.insert(2, 'Team', box_score.away_team)
-        away_batting_df.insert(3, 'HomeAway', 'Away')
-        batter_level = batter_level.append(away_batting_df, ignore_index=True)
-
-        home_batting_df = box_score.home_batting.iloc[:-1]
-        home_batting_df.insert(0, 'GameID', game_id)
-        home_batting_df.insert(2, 'Team', box_score.home_team)
-        home_batting_df.insert(3, 'HomeAway', 'Home')
-        batter_level = batter_level.append(home_batting_df, ignore_index=True)
-
-        # Populate batter level dataframe
-        away_pitch_df = box_score.away_pitching.iloc[:-1]
-        away_pitch_df.insert(0, 'GameID', game_id)
-        away_pitch_df.insert(2, 'Team', box_score.away_team)
-        away_pitch_df.insert(3, 'HomeAway', 'Away')
-        away_pitch_df.insert(4, 'Starter', box_score.away_pitching['Player'][0])
-        pitcher_level = pitcher_level.append(away_pitch_df, ignore_index=True)
-
-        home_pitch_df = box_score.home_pitching.iloc[:-1]
-        home_pitch_df.insert(0, 'GameID', game_id)
-        home_pitch_df.insert(2, 'Team', box_score.home_team)
-        home_pitch_df.insert(3, 'HomeAway', 'Home')
-        home_pitch_df.insert(4, 'Starter', box_score.home_pitching['Player'][0])
-        pitcher_level = pitcher_level.append(home_pitch_df, ignore_index=True)
-
-    out = {'Game' : game_level,
-            'Team' : team_level,
-            'Batter' : batter_level,
-            'Pitcher' : pitcher_level}
+        # Build every row for the game before adding any of them so a failure cannot leave a partial game
+        try:
+            # Generate unique game id
+            game_id = hash(box_score.away_team + box_score.home_team + str(box_score.date) + str(box_score.time))
+
+            # Convert date and time to datetime object if it exists
+
+            if isinstance(box_score.time, str):
+                new_datetime = dateparser.parse(box_score.date + ' ' + box_score.time.replace('Local', ''))
+            else:
+                new_datetime = dateparser.parse(box_score.date + ' 11:59 pm')
+
+            # Populate row of game level dataframe
+            linescore = box_score.linescore
+            game_row = {'GameID' : game_id,
+                                'AwayTeam' : box_score.away_team,
+                                'HomeTeam' : box_score.home_team,
+                                'DateTime' : new_datetime,
+                                'Attendance' : box_score.attendance,
+                                'Venue' : box_score.venue,
+                                'Duration' : box_score.duration,
+                                'Details' : box_score.time_place,
+                                'AwayScore' : linescore.loc[0, 'R'],
+                                'HomeScore' : linescore.loc[1, 'R'],
+                                'URL' : getattr(box_score, 'url', np.nan)}
+
+            # Populate team level dataframes
+            away_row = {'GameID' : game_id,
+                                        'Team' : box_score.away_team,
+                                        'GameNum': int(box_score.away_wins) + int(box_score.away_losses), 
+                                        'Opponent' : box_score.home_team,
+                                        'GameNumOpponent': int(box_score.home_wins) + int(box_score.home_losses), 
+                                        'Wins' : box_score.away_wins, 
+                                        'Losses' : box_score.away_losses,
+                                        'HomeAway' : 'Away',
+                                        'Inn1' : (linescore.loc[0, '1'] if '1' in linescore.columns else np.nan),
+                                        'Inn2' : (linescore.loc[0, '2'] if '2' in linescore.columns else np.nan),
+                                        'Inn3' : (linescore.loc[0, '3'] if '3' in linescore.columns else np.nan),
+                                        'Inn4' : (linescore.loc[0, '4'] if '4' in linescore.columns else np.nan),
+                                        'Inn5' : (linescore.loc[0, '5'] if '5' in linescore.columns else np.nan),
+                                        'Inn6' : (linescore.loc[0, '6'] if '6' in linescore.columns else np.nan),
+                                        'Inn7' : (linescore.loc[0, '7'] if '7' in linescore.columns else np.nan),
+                                        'Inn8' : (linescore.loc[0, '8'] if '8' in linescore.columns else np.nan),
+                                        'Inn9' : (linescore.loc[0, '9'] if '9' in linescore.columns else np.nan),
+                                        'Runs' : linescore.loc[0, 'R'],
+                                        'Hits' : linescore.loc[0, 'H'],
+                                        'Errors' : linescore.loc[0, 'E'],
+                                        'AB' : box_score.away_batting.iloc[-1]['AB'], 
+                                        'R' : box_score.away_batting.iloc[-1]['R'], 
+                                        'RBI' : box_score.away_batting.iloc[-1]['RBI'], 
+                                        'BB': box_score.away_batting.iloc[-1]['BB'], 
+                                        'SO' : box_score.away_batting.iloc[-1]['SO'], 
+                                        'PA' : box_score.away_batting.iloc[-1]['PA'], 
+                                        'BA' : box_score.away_batting.iloc[-1]['BA'],
+                                        'OBP' : box_score.away_batting.iloc[-1]['OBP'], 
+                                        'SLG' : box_score.away_batting.iloc[-1]['SLG'], 
+                                        'OPS' : box_score.away_batting.iloc[-1]['OPS'], 
+                                        'Pit' : box_score.away_batting.iloc[-1]['Pit'], 
+                                        'Str' : box_score.away_batting.iloc[-1]['Str'], 
+                                        'WPA' : box_score.away_batting.iloc[-1]['WPA'], 
+                                        'aLI' : box_score.away_batting.iloc[-1]['aLI'], 
+                                        'WPA+' : box_score.away_batting.iloc[-1]['WPA+'], 
+                                        'WPA-' : box_score.away_batting.iloc[-1]['WPA-'], 
+                                        'RE24' : box_score.away_batting.iloc[-1]['RE24'],
+                                        'PO' : box_score.away_batting.iloc[-1]['PO'],
+                                        'A' : box_score.away_batting.iloc[-1]['A'],
+                                        'Starter' : box_score.away_pitching.iloc[0, 0],
+                                        'IP' : box_score.away_pitching.iloc[-1]['IP'], 
+                                        'H_P' : box_score.away_pitching.iloc[-1]['H'], 
+                                        'R_P' : box_score.away_pitching.iloc[-1]['R'], 
+                                        'ER' : box_score.away_pitching.iloc[-1]['ER'], 
+                                        'BB_P' : box_score.away_pitching.iloc[-1]['BB'], 
+                                        'SO_P' : box_score.away_pitching.iloc[-1]['SO'], 
+                                        'HR_P' : box_score.away_pitching.iloc[-1]['HR'], 
+                                        'ERA' : box_score.away_pitching.iloc[-1]['ERA'],
+                                        'BF' : box_score.away_pitching.iloc[-1]['BF'], 
+                                        'Pit_P' : box_score.away_pitching.iloc[-1]['Pit'], 
+                                        'Str_P' : box_score.away_pitching.iloc[-1]['Str'], 
+                                        'Ctct' : box_score.away_pitching.iloc[-1]['Ctct'], 
+                                        'StS' : box_score.away_pitching.iloc[-1]['StS'], 
+                                        'StL' : box_score.away_pitching.iloc[-1]['StL'] , 
+                                        'GB' : box_score.away_pitching.iloc[-1]['GB'], 
+                                        'FB' : box_score.away_pitching.iloc[-1]['FB'], 
+                                        'LD' : box_score.away_pitching.iloc[-1]['LD'], 
+                                        'Unk' : box_score.away_pitching.iloc[-1]['Unk'],
+                                        'GSc' : box_score.away_pitching.iloc[-1]['GSc'], 
+                                        'IR' : box_score.away_pitching.iloc[-1]['IR'], 
+                                        'IS' : box_score.away_pitching.iloc[-1]['IS'], 
+                                        'WPA_P' : box_score.away_pitching.iloc[-1]['WPA'], 
+                                        'aLI_P' : box_score.away_pitching.iloc[-1]['aLI'], 
+                                        'RE24_P' : box_score.away_pitching.iloc[-1]['RE24']}
+
+            home_row = {'GameID' : game_id,
+                                        'Team' : box_score.home_team,
+                                        'GameNum': int(box_score.home_wins) + int(box_score.home_losses), 
+                                        'Opponent' : box_score.away_team,
+                                        'GameNumOpponent': int(box_score.away_wins) + int(box_score.away_losses), 
+                                        'Wins' : box_score.home_wins, 
+                                        'Losses' : box_score.home_losses,
+                                        'HomeAway' : 'Home',
+                                        'Inn1' : (linescore.loc[1, '1'] if '1' in linescore.columns else np.nan),
+                                        'Inn2' : (linescore.loc[1, '2'] if '2' in linescore.columns else np.nan),
+                                        'Inn3' : (linescore.loc[1, '3'] if '3' in linescore.columns else np.nan),
+                                        'Inn4' : (linescore.loc[1, '4'] if '4' in linescore.columns else np.nan),
+                                        'Inn5' : (linescore.loc[1, '5'] if '5' in linescore.columns else np.nan),
+                                        'Inn6' : (linescore.loc[1, '6'] if '6' in linescore.columns else np.nan),
+                                        'Inn7' : (linescore.loc[1, '7'] if '7' in linescore.columns else np.nan),
+                                        'Inn8' : (linescore.loc[1, '8'] if '8' in linescore.columns else np.nan),
+                                        'Inn9' : (linescore.loc[1, '9'] if '9' in linescore.columns else np.nan),
+                                        'Runs' : linescore.loc[1, 'R'],
+                                        'Hits' : linescore.loc[1, 'H'],
+                                        'Errors' : linescore.loc[1, 'E'],
+                                        'AB' : box_score.home_batting.iloc[-1]['AB'], 
+                                        'R' : box_score.home_batting.iloc[-1]['R'], 
+                                        'RBI' : box_score.home_batting.iloc[-1]['RBI'], 
+                                        'BB': box_score.home_batting.iloc[-1]['BB'], 
+                                        'SO' : box_score.home_batting.iloc[-1]['SO'], 
+                                        'PA' : box_score.home_batting.iloc[-1]['PA'], 
+                                        'BA' : box_score.home_batting.iloc[-1]['BA'],
+                                        'OBP' : box_score.home_batting.iloc[-1]['OBP'], 
+                                        'SLG' : box_score.home_batting.iloc[-1]['SLG'], 
+                                        'OPS' : box_score.home_batting.iloc[-1]['OPS'], 
+                                        'Pit' : box_score.home_batting.iloc[-1]['Pit'], 
+                                        'Str' : box_score.home_batting.iloc[-1]['Str'], 
+                                        'WPA' : box_score.home_batting.iloc[-1]['WPA'], 
+                                        'aLI' : box_score.home_batting.iloc[-1]['aLI'], 
+                                        'WPA+' : box_score.home_batting.iloc[-1]['WPA+'], 
+                                        'WPA-' : box_score.home_batting.iloc[-1]['WPA-'], 
+                                        'RE24' : box_score.home_batting.iloc[-1]['RE24'],
+                                        'PO' : box_score.home_batting.iloc[-1]['PO'],
+                                        'A' : box_score.home_batting.iloc[-1]['A'],
+                                        'Starter' : box_score.home_pitching.iloc[0, 0],
+                                        'IP' : box_score.home_pitching.iloc[-1]['IP'], 
+                                        'H_P' : box_score.home_pitching.iloc[-1]['H'], 
+                                        'R_P' : box_score.home_pitching.iloc[-1]['R'], 
+                                        'ER' : box_score.home_pitching.iloc[-1]['ER'], 
+                                        'BB_P' : box_score.home_pitching.iloc[-1]['BB'], 
+                                        'SO_P' : box_score.home_pitching.iloc[-1]['SO'], 
+                                        'HR_P' : box_score.home_pitching.iloc[-1]['HR'], 
+                                        'ERA' : box_score.home_pitching.iloc[-1]['ERA'],
+                                        'BF' : box_score.home_pitching.iloc[-1]['BF'], 
+                                        'Pit_P' : box_score.home_pitching.iloc[-1]['Pit'], 
+                                        'Str_P' : box_score.home_pitching.iloc[-1]['Str'], 
+                                        'Ctct' : box_score.home_pitching.iloc[-1]['Ctct'], 
+                                        'StS' : box_score.home_pitching.iloc[-1]['StS'], 
+                                        'StL' : box_score.home_pitching.iloc[-1]['StL'] , 
+                                        'GB' : box_score.home_pitching.iloc[-1]['GB'], 
+                                        'FB' : box_score.home_pitching.iloc[-1]['FB'], 
+                                        'LD' : box_score.home_pitching.iloc[-1]['LD'], 
+                                        'Unk' : box_score.home_pitching.iloc[-1]['Unk'],
+                                        'GSc' : box_score.home_pitching.iloc[-1]['GSc'], 
+                                        'IR' : box_score.home_pitching.iloc[-1]['IR'], 
+                                        'IS' : box_score.home_pitching.iloc[-1]['IS'], 
+                                        'WPA_P' : box_score.home_pitching.iloc[-1]['WPA'], 
+                                        'aLI_P' : box_score.home_pitching.iloc[-1]['aLI'], 
+                                        'RE24_P' : box_score.home_pitching.iloc[-1]['RE24']}
+
+
+            # Populate batter level dataframes
+            away_batting_df = box_score.away_batting.iloc[:-1]
+            away_batting_df.insert(0, 'GameID', game_id)
+            away_batting_df.insert(2, 'Team', box_score.away_team)
+            away_batting_df.insert(3, 'HomeAway', 'Away')
+
+            home_batting_df = box_score.home_batting.iloc[:-1]
+            home_batting_df.insert(0, 'GameID', game_id)
+            home_batting_df.insert(2, 'Team', box_score.home_team)
+            home_batting_df.insert(3, 'HomeAway', 'Home')
+
+            # Populate batter level dataframe
+            away_pitch_df = box_score.away_pitching.iloc[:-1]
+            away_pitch_df.insert(0, 'GameID', game_id)
+            away_pitch_df.insert(2, 'Team', box_score.away_team)
+            away_pitch_df.insert(3, 'HomeAway', 'Away')
+            away_pitch_df.insert(4, 'Starter', box_score.away_pitching['Player'][0])
+
+            home_pitch_df = box_score.home_pitching.iloc[:-1]
+            home_pitch_df.insert(0, 'GameID', game_id)
+            home_pitch_df.insert(2, 'Team', box_score.home_team)
+            home_pitch_df.insert(3, 'HomeAway', 'Home')
+            home_pitch_df.insert(4, 'Starter', box_score.home_pitching['Player'][0])
+        except Exception as e:
+            if quarantine is None:
+                raise
+            quarantine.append({'URL' : getattr(box_score, 'url', np.nan), 'Stage' : 'parse', 'Error' : repr(e)})
+            continue
+
+        game_ids.append(game_id)
+        linescores.append(linescore)
+        game_rows.append(game_row)
+        team_rows.extend([away_row, home_row])
+        batter_frames.extend([away_batting_df, home_batting_df])
+        pitcher_frames.extend([away_pitch_df, home_pitch_df])
+
+    out = {'Game' : pd.DataFrame(game_rows, columns=game_cols),
+            'Team' : pd.DataFrame(team_rows, columns=team_cols),
+            'Batter' : stack_frames(batter_frames, batter_cols),
+            'Pitcher' : stack_frames(pitcher_frames, pitcher_cols),
+            'Innings' : innings.InningStore.from_linescores(game_ids, linescores)}
     return out
\ No newline at end of file
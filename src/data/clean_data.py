@@ -2,6 +2,39 @@ import pandas as pd
 import numpy as np
 import datetime
 
+# Team abbreviations used in the odds data
+TEAM_ABBRV = {'Atlanta Braves' : 'ATL', 
+              'Arizona Diamondbacks' : 'ARI', 
+              'Baltimore Orioles' : 'BAL', 
+              'Boston Red Sox' : 'BOS', 
+              'Chicago Cubs' : 'CUB', 
+              'Chicago White Sox' : 'CWS', 
+              'Cincinnati Reds' : 'CIN', 
+              'Cleveland Indians' : 'CLE', 
+              'Colorado Rockies' : 'COL', 
+              'Detroit Tigers' : 'DET',
+              'Kansas City Royals': 'KAN', 
+              'Houston Astros' : 'HOU', 
+              'Los Angeles Angels' : 'LAA', 
+              'Los Angeles Dodgers' : 'LAD', 
+              'Miami Marlins' : 'MIA', 
+              'Florida Marlins' : 'FLA', 
+              'Milwaukee Brewers' : 'MIL', 
+              'Minnesota Twins' : 'MIN', 
+              'New York Mets' : 'NYM', 
+              'New York Yankees' : 'NYY', 
+              'Oakland Athletics' : 'OAK',
+              'Philadelphia Phillies' : 'PHI', 
+              'Pittsburgh Pirates' : 'PIT', 
+              'San Diego Padres' : 'SDG', 
+              'Seattle Mariners' : 'SEA', 
+              'San Francisco Giants' : 'SFO', 
+              'St. Louis Cardinals' : 'STL', 
+              'Tampa Bay Rays' : 'TAM', 
+              'Texas Rangers' : 'TEX', 
+              'Toronto Blue Jays' : 'TOR', 
+              'Washington Nationals' : 'WAS'}
+
 def clean_team_season_data(team_level, game_level):
     """Cleaning team and game level data from a single season to prepare for modeling.
     
@@ -93,37 +126,7 @@ def generate_odds_lookup(game_level, odds):
       odds.rename(columns={'Team' : 'Team_abrv', 'Final' : 'Runs', 'Unnamed: 18' : 'Run_Odds', 'Unnamed: 20' : 'Open_OU_Odds', 'Unnamed: 22' : 'Close_OU_Odds'}, inplace=True)
 
       # Give game level data name abbreviations to match odds data
-      team_abbrv = {'Atlanta Braves' : 'ATL', 
-              'Arizona Diamondbacks' : 'ARI', 
-              'Baltimore Orioles' : 'BAL', 
-              'Boston Red Sox' : 'BOS', 
-              'Chicago Cubs' : 'CUB', 
-              'Chicago White Sox' : 'CWS', 
-              'Cincinnati Reds' : 'CIN', 
-              'Cleveland Indians' : 'CLE', 
-              'Colorado Rockies' : 'COL', 
-              'Detroit Tigers' : 'DET',
-              'Kansas City Royals': 'KAN', 
-              'Houston Astros' : 'HOU', 
-              'Los Angeles Angels' : 'LAA', 
-              'Los Angeles Dodgers' : 'LAD', 
-              'Miami Marlins' : 'MIA', 
-              'Florida Marlins' : 'FLA', 
-              'Milwaukee Brewers' : 'MIL', 
-              'Minnesota Twins' : 'MIN', 
-              'New York Mets' : 'NYM', 
-              'New York Yankees' : 'NYY', 
-              'Oakland Athletics' : 'OAK',
-              'Philadelphia Phillies' : 'PHI', 
-              'Pittsburgh Pirates' : 'PIT', 
-              'San Diego Padres' : 'SDG', 
-              'Seattle Mariners' : 'SEA', 
-              'San Francisco Giants' : 'SFO', 
-              'St. Louis Cardinals' : 'STL', 
-              'Tampa Bay Rays' : 'TAM', 
-              'Texas Rangers' : 'TEX', 
-              'Toronto Blue Jays' : 'TOR', 
-              'Washington Nationals' : 'WAS'}
+      team_abbrv = TEAM_ABBRV
       game_level['Home_abrv'] = game_level['HomeTeam'].apply(lambda x: team_abbrv[x])
       game_level['Away_abrv'] = game_level['AwayTeam'].apply(lambda x: team_abbrv[x])
       game_level['Date'] = game_level['DateTime'].map(lambda x: x.month*100 + x.day)
@@ -0,0 +1,134 @@
+'''
+innings.py
+This file is used for storing inning-by-inning runs for games of any length and answering
+partial-game queries (first five innings, late innings, scoring in a given inning) across all games at once.
+'''
+
+import numpy as np
+import pandas as pd
+
+
+class InningStore(object):
+    """Ragged store of runs scored per inning, one row per team per game.
+
+    Rows come in pairs, the away team followed by the home team, and row i covers
+    values[offsets[i]:offsets[i + 1]], so extra innings are kept exactly. Innings that were not played
+    (the 'X' for a home team that did not bat in the bottom of the 9th) are stored as 0 with missing set.
+
+    Attributes:
+    game_ids: int64 array with the GameID of each row
+    teams: object array with the team name of each row
+    home: bool array, True for the home team's row
+    offsets: int64 array of length n_rows + 1 into values
+    values: int16 array of runs per inning
+    missing: bool array aligned with values, True for innings that were not played
+
+    Constructor takes:
+    game_ids, teams, home, offsets, values, missing: arrays as described above
+    """
+
+    def __init__(self, game_ids, teams, home, offsets, values, missing):
+        self.game_ids = np.asarray(game_ids, dtype=np.int64)
+        self.teams = np.asarray(teams, dtype=object)
+        self.home = np.asarray(home, dtype=bool)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.int16)
+        self.missing = np.asarray(missing, dtype=bool)
+        self.lengths = np.diff(self.offsets)
+        self.cumulative = np.concatenate([[0], np.cumsum(np.where(self.missing, 0, self.values), dtype=np.int64)])
+
+    @classmethod
+    def from_linescores(cls, game_ids, linescores):
+        """Builds the store from linescore DataFrames as scraped by BoxScoreScraper.scrape_linescore.
+
+        Args:
+        game_ids (list of int): GameID for each linescore
+        linescores (list of DataFrame): two rows (away, home) with a Team column, one column per inning
+            named '1', '2', ... and R/H/E columns
+
+        Returns:
+        InningStore: store with two rows per game
+        """
+
+        row_ids, row_teams, row_home, lengths, values = [], [], [], [], []
+        for game_id, linescore in zip(game_ids, linescores):
+            inning_cols = sorted([col for col in linescore.columns if str(col).isdigit()], key=int)
+            runs = linescore[inning_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+            for side in range(2):
+                row_ids.append(game_id)
+                row_teams.append(linescore['Team'].iloc[side])
+                row_home.append(side == 1)
+                lengths.append(len(inning_cols))
+                values.append(runs[side])
+
+        offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+        values = np.concatenate(values) if values else np.zeros(0)
+        missing = np.isnan(values)
+        return cls(row_ids, row_teams, row_home, offsets, np.where(missing, 0, values), missing)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def innings_played(self):
+        """Number of innings each row batted in."""
+        missing_cumulative = np.concatenate([[0], np.cumsum(self.missing, dtype=np.int64)])
+        return self.lengths - (missing_cumulative[self.offsets[1:]] - missing_cumulative[self.offsets[:-1]])
+
+    def runs_between(self, first=1, last=None):
+        """Runs scored in innings first through last (inclusive, 1-based) for every row.
+
+        Innings beyond the length of a game count as zero, so runs_between(7) gives runs in the 7th inning or later
+        and runs_between(1, 5) gives first-five-innings runs.
+        """
+        start = self.offsets[:-1]
+        lo = start + np.clip(first - 1, 0, self.lengths)
+        hi = start + (self.lengths if last is None else np.clip(last, 0, self.lengths))
+        return self.cumulative[np.maximum(hi, lo)] - self.cumulative[lo]
+
+    def inning_runs(self, inning):
+        """Runs scored in a single inning for every row, NaN where the inning was not played."""
+        has_inning = self.lengths >= inning
+        position = self.offsets[:-1] + np.where(has_inning, inning - 1, 0)
+        position = np.minimum(position, max(len(self.values) - 1, 0))
+        played = has_inning & ~self.missing[position]
+        return np.where(played, self.values[position], np.nan)
+
+    def scored_in(self, inning):
+        """Whether each row scored in the given inning, False where the inning was not played."""
+        return self.inning_runs(inning) > 0
+
+    def game_table(self, first=1, last=None):
+        """Runs for each team between two innings as a game level table with GameID, AwayRuns and HomeRuns columns."""
+        runs = self.runs_between(first, last)
+        return pd.DataFrame({'GameID' : self.game_ids[~self.home],
+                             'AwayRuns' : runs[~self.home],
+                             'HomeRuns' : runs[self.home]})
+
+    def to_wide(self, n_innings=9):
+        """Returns the first n_innings as Inn1, Inn2, ... columns in the same layout as parse_box_scores."""
+        df = pd.DataFrame({'GameID' : self.game_ids, 'Team' : self.teams,
+                           'HomeAway' : np.where(self.home, 'Home', 'Away')})
+        for inning in range(1, n_innings + 1):
+            df['Inn' + str(inning)] = self.inning_runs(inning)
+        return df
+
+    def subset(self, mask):
+        """Returns a new store with only the rows where mask is True."""
+        mask = np.asarray(mask, dtype=bool)
+        lengths = self.lengths[mask]
+        offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+        positions = np.repeat(self.offsets[:-1][mask] - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return InningStore(self.game_ids[mask], self.teams[mask], self.home[mask], offsets,
+                           self.values[positions], self.missing[positions])
+
+    def save(self, path):
+        """Saves the store to a single .npz file."""
+        np.savez(path, game_ids=self.game_ids, teams=self.teams.astype(str), home=self.home, offsets=self.offsets,
+                 values=self.values, missing=self.missing)
+
+    @classmethod
+    def load(cls, path):
+        """Loads a store written by save."""
+        with np.load(path) as data:
+            return cls(data['game_ids'], data['teams'].astype(object), data['home'], data['offsets'],
+                       data['values'], data['missing'])
@@ -0,0 +1,185 @@
+'''
+validate.py
+This file is used for consistency checks on box scores parsed by bbref_scrape.parse_box_scores. Checks run on
+whole tables at once and games that fail are moved to a quarantine table instead of stopping the run.
+'''
+
+import numpy as np
+import pandas as pd
+
+BOX_SCORE_ATTRIBUTES = ['away_team', 'home_team', 'date', 'time', 'away_wins', 'away_losses', 'home_wins', 'home_losses',
+                        'linescore', 'away_batting', 'home_batting', 'away_pitching', 'home_pitching']
+
+# Team batting totals compared against the sum of the player rows
+BATTING_TOTALS = ['AB', 'R', 'RBI', 'BB', 'SO', 'PA']
+
+
+def check_box_score(box_score):
+    """Returns a list of reasons a scraped BoxScore cannot be parsed, empty if it looks complete."""
+    problems = ['missing ' + name for name in BOX_SCORE_ATTRIBUTES if getattr(box_score, name, None) is None]
+    if problems:
+        return problems
+    if len(box_score.linescore) != 2 or not {'R', 'H', 'E'}.issubset(box_score.linescore.columns):
+        problems.append('linescore does not have two rows with R, H and E')
+    for name in ('away_batting', 'home_batting', 'away_pitching', 'home_pitching'):
+        if len(getattr(box_score, name)) < 2:
+            problems.append(name + ' has no player rows')
+    return problems
+
+
+def numeric(df, cols):
+    """Returns the columns as floats with anything unparseable as NaN."""
+    return df[cols].apply(pd.to_numeric, errors='coerce').astype(float)
+
+
+def mismatches(expected, actual, cols, check):
+    """Builds quarantine rows for every row where any of the columns differ, listing the differing columns."""
+    differs = pd.DataFrame({col : ~np.isclose(expected[col], actual[col]) for col in cols}, index=expected.index)
+    failed = differs.any(axis=1)
+    detail = pd.Series('', index=expected.index)
+    for col in cols:
+        text = col + ' ' + expected[col].astype(str) + ' != ' + actual[col].astype(str) + '; '
+        detail = detail + text.where(differs[col], '')
+    out = expected.index.to_frame(index=False)[failed.to_numpy()]
+    out['Check'] = check
+    out['Detail'] = detail[failed].str.rstrip('; ').to_numpy()
+    return out
+
+
+def check_linescore_runs(team_level, inning_store=None):
+    """Checks that the runs per inning add up to the final runs for every team in every game.
+
+    Uses the InningStore from parse_box_scores when given so extra innings are included, otherwise Inn1-Inn9.
+    """
+    runs = team_level.set_index(['GameID', 'HomeAway'])
+    expected = numeric(runs, ['Runs'])
+    if inning_store is not None:
+        actual = pd.DataFrame({'Runs' : inning_store.runs_between().astype(float)},
+                              index=pd.MultiIndex.from_arrays([inning_store.game_ids,
+                                                               np.where(inning_store.home, 'Home', 'Away')],
+                                                              names=['GameID', 'HomeAway']))
+    else:
+        actual = pd.DataFrame({'Runs' : numeric(runs, ['Inn' + str(i) for i in range(1, 10)]).sum(axis=1)})
+    actual = actual.reindex(expected.index)
+    return mismatches(expected, actual, ['Runs'], 'linescore_runs')
+
+
+def check_batting_totals(team_level, batter_level):
+    """Checks that the team batting totals match the sum of the player rows for every team in every game."""
+    expected = numeric(team_level.set_index(['GameID', 'HomeAway']), BATTING_TOTALS)
+    players = numeric(batter_level, BATTING_TOTALS)
+    players['GameID'] = batter_level['GameID'].to_numpy()
+    players['HomeAway'] = batter_level['HomeAway'].to_numpy()
+    actual = players.groupby(['GameID', 'HomeAway']).sum().reindex(expected.index)
+    return mismatches(expected, actual, BATTING_TOTALS, 'batting_totals')
+
+
+def check_game_scores(game_level, team_level):
+    """Checks that the final score on the game level table matches the runs on the team level table."""
+    expected = numeric(game_level.set_index('GameID'), ['AwayScore', 'HomeScore'])
+    runs = team_level.pivot_table(index='GameID', columns='HomeAway', values='Runs', aggfunc='first')
+    actual = numeric(runs.rename(columns={'Away' : 'AwayScore', 'Home' : 'HomeScore'}).reindex(expected.index),
+                     ['AwayScore', 'HomeScore'])
+    return mismatches(expected, actual, ['AwayScore', 'HomeScore'], 'game_score')
+
+
+def record_steps_ok(before, after, won):
+    """Checks whether a team's W-L record can move from before to after, with won the team's result in the later game.
+
+    The change in games played can be any positive number since the games in between may not have been scraped,
+    but neither wins nor losses may go backwards and a step of exactly one game has to agree with the result.
+    Games played is wins plus losses, so the win and loss steps always add up to the change in games played.
+    """
+    step_wins = after['Wins'] - before['Wins']
+    step_losses = after['Losses'] - before['Losses']
+    gap = after['Games'] - before['Games']
+    return (gap > 0) & (step_wins >= 0) & (step_losses >= 0) & ((gap != 1) | (step_wins == won))
+
+
+def format_record(record):
+    """Formats W-L records, missing records show as none."""
+    text = record['Wins'].astype('Int64').astype(str) + '-' + record['Losses'].astype('Int64').astype(str)
+    return text.where(record['Wins'].notna() & record['Losses'].notna(), 'none')
+
+
+def check_records(team_level, game_level):
+    """Checks that each team's W-L records fit together in date order within a season.
+
+    A record is flagged when its step in or out is inconsistent (see record_steps_ok) and dropping it makes its
+    neighbours consistent again, so a bad record does not take the valid games around it with it. A season's first
+    record is flagged when its step out is inconsistent but the next record steps out consistently and is not
+    already to blame, and any other inconsistent step left unexplained flags its later game.
+    """
+    dates = pd.to_datetime(game_level.set_index('GameID')['DateTime'])
+    teams = numeric(team_level, ['Wins', 'Losses', 'Runs'])
+    teams['GameID'] = team_level['GameID'].to_numpy()
+    teams['HomeAway'] = team_level['HomeAway'].to_numpy()
+    teams['Team'] = team_level['Team'].to_numpy()
+    teams['DateTime'] = dates.reindex(team_level['GameID']).to_numpy()
+    teams['Season'] = teams['DateTime'].dt.year
+
+    # Opponent's runs are the game total less the team's own
+    opponent_runs = teams.groupby('GameID')['Runs'].transform('sum') - teams['Runs']
+    teams['Won'] = (teams['Runs'] > opponent_runs).astype(float)
+
+    # Games are ordered by date so a bad record cannot move its own game out of place
+    teams['Games'] = teams['Wins'] + teams['Losses']
+    teams = teams.sort_values(['Team', 'DateTime', 'Games'], kind='stable').reset_index(drop=True)
+    by_season = teams.groupby(['Team', 'Season'])
+    cols = ['Wins', 'Losses', 'Games']
+    previous = by_season[cols].shift(1)
+    following = by_season[cols].shift(-1)
+    has_previous = previous['Games'].notna()
+    has_following = following['Games'].notna()
+
+    bad_in = has_previous & ~record_steps_ok(previous, teams, teams['Won'])
+    bad_out = has_following & ~record_steps_ok(teams, following, by_season['Won'].shift(-1))
+    skip_ok = has_previous & has_following & record_steps_ok(previous, following, by_season['Won'].shift(-1))
+
+    # Blame the record whose removal mends the sequence, then account for every inconsistent step left over
+    seasons = [teams['Team'], teams['Season']]
+    bad = (bad_in | bad_out) & skip_ok
+    bad |= (~has_previous & bad_out & (has_following & ~bad_out).groupby(seasons).shift(-1, fill_value=False) &
+            ~bad.groupby(seasons).shift(-1, fill_value=False))
+    bad |= bad_in & ~bad.groupby(seasons).shift(1, fill_value=False)
+
+    failed = teams[bad]
+    out = failed[['GameID', 'HomeAway']].reset_index(drop=True)
+    out['Check'] = 'record_sequence'
+    out['Detail'] = (failed['Team'] + ' record ' + format_record(failed) +
+                     np.where(failed['Won'] == 1, ' after a win', ' after a loss') + ' does not fit between ' +
+                     format_record(previous[bad]) + ' and ' + format_record(following[bad])).to_numpy()
+    return out
+
+
+def validate_parsed(parsed):
+    """Runs every consistency check on the output of bbref_scrape.parse_box_scores and quarantines failing games.
+
+    Args:
+    parsed (dict): output of bbref_scrape.parse_box_scores with Game, Team, Batter, Pitcher and optionally Innings
+
+    Returns:
+    tuple: (clean, quarantine) where clean has the same keys as parsed with every quarantined game removed,
+    and quarantine is a DataFrame with one row per failed check with GameID, HomeAway, Check, Detail and URL
+    """
+
+    game_level, team_level = parsed['Game'], parsed['Team']
+    inning_store = parsed.get('Innings')
+    # A batch where every box score was quarantined at parse has nothing left to check
+    if len(game_level) == 0 and len(team_level) == 0:
+        return dict(parsed), pd.DataFrame(columns=['GameID', 'HomeAway', 'Check', 'Detail', 'URL'])
+    quarantine = pd.concat([check_game_scores(game_level, team_level),
+                            check_linescore_runs(team_level, inning_store),
+                            check_batting_totals(team_level, parsed['Batter']),
+                            check_records(team_level, game_level)], ignore_index=True)
+    if 'URL' in game_level.columns:
+        quarantine['URL'] = game_level.set_index('GameID')['URL'].reindex(quarantine['GameID']).to_numpy()
+
+    bad_ids = quarantine['GameID'].unique()
+    clean = {}
+    for key, df in parsed.items():
+        if key == 'Innings':
+            clean[key] = df.subset(~np.isin(df.game_ids, bad_ids))
+        else:
+            clean[key] = df[~df['GameID'].isin(bad_ids)].reset_index(drop=True)
+    return clean, quarantine
@@ -0,0 +1,95 @@
+'''
+feature_matrix.py
+This file is used for exporting the final modeling table to memory-mapped arrays so that
+many training processes can share a single copy of the data.
+'''
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+
+def export_feature_matrix(model_data, features, label, out_dir, name='model_data', id_col='GameID', dropna=True):
+    """Writes the numeric features and labels of a modeling table to float32 .npy files plus a json sidecar.
+
+    The arrays are written in C order with numpy's .npy format so they can be opened with np.load(mmap_mode='r').
+    Every process that opens them shares the same pages in the OS page cache instead of holding its own copy
+    of the DataFrame.
+
+    Args:
+    model_data (DataFrame): modeling table, e.g. the output of clean_data.clean_team_season_data merged with odds
+    features (list of str): numeric columns to store in the feature matrix, in order
+    label (str): column to store as the label vector
+    out_dir (str): directory to write the files to, created if it does not exist
+    name (str): prefix for the written files
+    id_col (str): column stored alongside the matrix so rows can be joined back to the source table
+    dropna (bool): whether to drop rows with a missing feature or label before writing
+
+    Returns:
+    dict: metadata written to the sidecar, including the paths of the arrays
+    """
+
+    data = model_data[[id_col] + list(features) + [label]]
+    if dropna:
+        data = data.dropna(subset=list(features) + [label])
+
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {'X' : os.path.join(out_dir, name + '_X.npy'),
+             'y' : os.path.join(out_dir, name + '_y.npy'),
+             'ids' : os.path.join(out_dir, name + '_ids.npy')}
+
+    # Write feature matrix column by column so we never hold a second full-size copy in memory
+    X = np.lib.format.open_memmap(paths['X'], mode='w+', dtype=np.float32, shape=(len(data), len(features)))
+    for j, col in enumerate(features):
+        X[:, j] = data[col].to_numpy(dtype=np.float32, na_value=np.nan)
+    X.flush()
+    del X
+
+    np.save(paths['y'], data[label].to_numpy(dtype=np.float32, na_value=np.nan))
+    np.save(paths['ids'], data[id_col].to_numpy(dtype=np.int64))
+
+    meta = {'name' : name,
+            'n_rows' : int(len(data)),
+            'features' : list(features),
+            'label' : label,
+            'id_col' : id_col,
+            'dtype' : 'float32',
+            'files' : {key : os.path.basename(path) for key, path in paths.items()}}
+    with open(os.path.join(out_dir, name + '_meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    return meta
+
+
+def load_feature_matrix(out_dir, name='model_data', mmap_mode='r'):
+    """Opens a feature matrix written by export_feature_matrix.
+
+    Args:
+    out_dir (str): directory the files were written to
+    name (str): prefix used when writing the files
+    mmap_mode (str): passed to np.load, use None to read the arrays fully into memory
+
+    Returns:
+    tuple: (X, y, ids, meta) where X is an (n_rows, n_features) float32 array, y and ids are 1-d arrays
+    and meta is the sidecar dictionary
+    """
+
+    with open(os.path.join(out_dir, name + '_meta.json')) as f:
+        meta = json.load(f)
+
+    X = np.load(os.path.join(out_dir, meta['files']['X']), mmap_mode=mmap_mode)
+    y = np.load(os.path.join(out_dir, meta['files']['y']), mmap_mode=mmap_mode)
+    ids = np.load(os.path.join(out_dir, meta['files']['ids']), mmap_mode=mmap_mode)
+
+    if X.shape != (meta['n_rows'], len(meta['features'])):
+        raise Exception('Feature matrix shape ' + str(X.shape) + ' does not match metadata in ' + name + '_meta.json')
+
+    return X, y, ids, meta
+
+
+def feature_matrix_to_frame(X, ids, meta):
+    """Wraps a loaded feature matrix in a DataFrame with the original column names without copying X."""
+    df = pd.DataFrame(X, columns=meta['features'], copy=False)
+    df.insert(0, meta['id_col'], ids)
+    return df
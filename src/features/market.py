@@ -0,0 +1,149 @@
+'''
+market.py
+This file is used for turning the raw odds files into market-implied probabilities. Every line in every
+season is converted in one vectorized pass, the vig is removed and open-to-close movement is computed.
+'''
+
+import numpy as np
+import pandas as pd
+from src.data.clean_data import TEAM_ABBRV
+
+# Team codes some seasons of the odds files use in place of the ones in TEAM_ABBRV
+TEAM_ALIASES = {'LOS' : 'LAD', 'HOW' : 'HOU'}
+
+
+def american_odds_to_profit(odds):
+    """Converts American odds to the profit won per unit staked. Works elementwise on arrays."""
+    odds = np.asarray(odds, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(odds > 0, odds / 100, -100 / odds)
+
+
+def implied_probability(odds):
+    """Converts American odds to the implied probability of winning (including the vig). Works elementwise on arrays."""
+    odds = np.asarray(odds, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(odds > 0, 100 / (odds + 100), -odds / (100 - odds))
+
+
+def no_vig(odds_a, odds_b):
+    """Removes the vig from a two sided market by normalizing the implied probabilities.
+
+    Returns:
+    tuple: (probability of side A without vig, overround) where the overround is the sum of the
+    implied probabilities minus one
+    """
+    prob_a = implied_probability(odds_a)
+    total = prob_a + implied_probability(odds_b)
+    return prob_a / total, total - 1
+
+
+def build_market_features(odds_by_season):
+    """Builds a table of market-implied probabilities with one row per game.
+
+    The odds files have one row per team with the visiting team first and the home team second
+    (neutral site games are marked N and the second team is treated as home). Moneyline columns are
+    Open and Close, the run line and its price are 'Run Line' and the unnamed column after it, and
+    totals are 'Open OU' and 'Close OU' with their prices in the unnamed column after each. The visiting
+    team's row carries the over price and the home team's row the under price. Team codes are normalized with
+    TEAM_ALIASES so a team has the same code in every season.
+
+    Args:
+    odds_by_season (dict): season (int) to raw odds DataFrame as read from data/mlbodds<season>.csv
+
+    Returns:
+    DataFrame: keyed by Season, Date (month*100 + day), AwayTeam, HomeTeam and DayGame (0 for the first game
+    between the teams that day, 1 for the second game of a doubleheader), with final scores, no-vig
+    probabilities for each market as float32, the overround of each market and open-to-close movement
+    """
+
+    frames = []
+    for season, odds in odds_by_season.items():
+        odds = odds.reset_index(drop=True)
+        columns = list(odds.columns)
+        prices = {'Run_Odds' : columns[columns.index('Run Line') + 1],
+                  'Open_OU_Odds' : columns[columns.index('Open OU') + 1],
+                  'Close_OU_Odds' : columns[columns.index('Close OU') + 1]}
+        odds = odds.rename(columns={value : key for key, value in prices.items()})
+        odds.insert(0, 'Season', season)
+        frames.append(odds)
+    odds = pd.concat(frames, ignore_index=True)
+    odds['Team'] = odds['Team'].replace(TEAM_ALIASES)
+
+    away = odds.iloc[0::2].reset_index(drop=True)
+    home = odds.iloc[1::2].reset_index(drop=True)
+    if len(away) != len(home) or not ((away['VH'] == 'V') & (home['VH'] == 'H') |
+                                      (away['VH'] == 'N') & (home['VH'] == 'N')).all():
+        raise Exception('Odds rows must come in visitor/home pairs')
+
+    def numeric(df, col):
+        return pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+
+    teams = pd.CategoricalDtype(sorted(set(TEAM_ABBRV.values()) | set(away['Team']) | set(home['Team'])))
+    market = pd.DataFrame({'Season' : away['Season'].to_numpy(dtype=np.int16),
+                           'Date' : away['Date'].to_numpy(dtype=np.int16),
+                           'AwayTeam' : pd.Categorical(away['Team'], dtype=teams),
+                           'HomeTeam' : pd.Categorical(home['Team'], dtype=teams),
+                           'AwayScore' : away['Final'].to_numpy(dtype=np.int16),
+                           'HomeScore' : home['Final'].to_numpy(dtype=np.int16)})
+    market.insert(4, 'DayGame', market.groupby(['Season', 'Date', 'AwayTeam', 'HomeTeam'], observed=True).cumcount()
+                                      .to_numpy(dtype=np.int8))
+
+    features = {}
+
+    # Moneyline
+    for when in ('Open', 'Close'):
+        prob, vig = no_vig(numeric(home, when), numeric(away, when))
+        features['HomeWinProb' + when] = prob
+        features['MLVig' + when] = vig
+    features['HomeWinProbMove'] = features['HomeWinProbClose'] - features['HomeWinProbOpen']
+
+    # Run line, quoted from the home team's side
+    prob, vig = no_vig(numeric(home, 'Run_Odds'), numeric(away, 'Run_Odds'))
+    features['HomeRunLine'] = numeric(home, 'Run Line')
+    features['HomeCoverProb'] = prob
+    features['RLVig'] = vig
+
+    # Totals
+    for when in ('Open', 'Close'):
+        prob, vig = no_vig(numeric(away, when + '_OU_Odds'), numeric(home, when + '_OU_Odds'))
+        features['Total' + when] = numeric(home, when + ' OU')
+        features['OverProb' + when] = prob
+        features['OUVig' + when] = vig
+    features['TotalMove'] = features['TotalClose'] - features['TotalOpen']
+    features['OverProbMove'] = features['OverProbClose'] - features['OverProbOpen']
+
+    for name, values in features.items():
+        market[name] = values.astype(np.float32)
+    return market
+
+
+def join_market_features(game_level, market):
+    """Joins market features onto game level data output by bbref_scrape.parse_box_scores.
+
+    Unlike clean_data.generate_odds_lookup, doubleheaders are matched by the order of the games within the day.
+
+    Args:
+    game_level (DataFrame): game level data with AwayTeam, HomeTeam and DateTime
+    market (DataFrame): output of build_market_features
+
+    Returns:
+    DataFrame: game_level with the market columns appended, games without odds have missing values
+    """
+
+    games = game_level.copy()
+    dates = pd.to_datetime(games['DateTime'])
+    games['Season'] = dates.dt.year.astype(np.int16)
+    games['Date'] = (dates.dt.month*100 + dates.dt.day).astype(np.int16)
+    games['Away_abrv'] = games['AwayTeam'].map(TEAM_ABBRV)
+    games['Home_abrv'] = games['HomeTeam'].map(TEAM_ABBRV)
+    # Teams missing from TEAM_ABBRV have no abbreviation, they are kept in their own group and simply find no odds
+    order = dates.rank(method='first')
+    games['DayGame'] = (order.groupby([games['Season'], games['Date'], games['Away_abrv'], games['Home_abrv']], dropna=False)
+                             .rank(method='first').astype(np.int8) - 1)
+
+    keyed = market.rename(columns={'AwayTeam' : 'Away_abrv', 'HomeTeam' : 'Home_abrv',
+                                   'AwayScore' : 'AwayScore_odds', 'HomeScore' : 'HomeScore_odds'})
+    keyed['Away_abrv'] = keyed['Away_abrv'].astype(str)
+    keyed['Home_abrv'] = keyed['Home_abrv'].astype(str)
+    return games.merge(keyed, how='left', on=['Season', 'Date', 'Away_abrv', 'Home_abrv', 'DayGame'])
@@ -0,0 +1,194 @@
+'''
+ratings.py
+This file is used for computing Elo-style team ratings from game level data. Games are processed in a single
+chronological pass, ratings carry over between seasons with regression toward the mean and every game
+gets the ratings both teams had before it was played.
+'''
+
+import math
+import itertools
+import numpy as np
+import pandas as pd
+
+
+class EloRatings(object):
+    """Elo ratings for every team, updated one game at a time.
+
+    Teams are stored as compact integer codes indexing into a preallocated array of ratings so an update is O(1).
+
+    Constructor takes:
+    k: size of the rating update for a game with a fully unexpected result
+    home_advantage: rating points added to the home team when computing the expected result
+    revert: fraction of the distance to the mean each rating moves back at the start of a new season
+    mean: rating given to new teams and reverted toward between seasons
+    scale: rating difference at which the favourite is expected to win 10 times out of 11
+    mov: whether to scale updates by the margin of victory
+    """
+
+    def __init__(self, k=4.0, home_advantage=24.0, revert=1/3, mean=1500.0, scale=400.0, mov=False):
+        self.k = k
+        self.home_advantage = home_advantage
+        self.revert = revert
+        self.mean = mean
+        self.scale = scale
+        self.mov = mov
+        self.codes = {}
+        self.ratings = np.empty(0)
+        self.season = None
+
+    def add_teams(self, teams):
+        """Gives every unseen team a code at the mean rating, growing the ratings array once for all of them.
+
+        Returns:
+        ndarray: integer code of each team in teams
+        """
+        new = [team for team in pd.unique(pd.Series(teams)) if team not in self.codes]
+        if new:
+            self.codes.update({team : len(self.codes) + i for i, team in enumerate(new)})
+            self.ratings = np.concatenate([self.ratings, np.full(len(new), self.mean)])
+        return np.array([self.codes[team] for team in teams], dtype=np.int64)
+
+    def team_code(self, team):
+        """Returns the integer code of a team, adding it at the mean rating if it has not been seen."""
+        code = self.codes.get(team)
+        if code is None:
+            code = int(self.add_teams([team])[0])
+        return code
+
+    def start_season(self, season):
+        """Regresses every rating toward the mean if season is later than the current season."""
+        if self.season is not None and season > self.season:
+            # In place so references to the ratings array stay valid
+            self.ratings += self.revert * (self.mean - self.ratings)
+        self.season = season if self.season is None else max(self.season, season)
+
+    def home_win_prob(self, away, home):
+        """Probability the home team wins according to the current ratings."""
+        away_code, home_code = self.team_code(away), self.team_code(home)
+        diff = self.ratings[home_code] + self.home_advantage - self.ratings[away_code]
+        return 1 / (1 + 10**(-diff / self.scale))
+
+    def update(self, away, home, away_score, home_score, season=None):
+        """Updates the ratings with one result.
+
+        Args:
+        away (str): away team
+        home (str): home team
+        away_score (int): runs scored by the away team
+        home_score (int): runs scored by the home team
+        season (int): season the game was played in, triggers regression toward the mean when it changes
+
+        Returns:
+        tuple: (away rating, home rating, home win probability) before the game
+        """
+
+        if season is not None:
+            self.start_season(season)
+        away_code, home_code = self.team_code(away), self.team_code(home)
+        away_rating, home_rating = float(self.ratings[away_code]), float(self.ratings[home_code])
+        diff = home_rating + self.home_advantage - away_rating
+        prob = 1 / (1 + 10**(-diff / self.scale))
+        shift = self.k * (self.result(home_score - away_score) - prob) * self.multiplier(home_score - away_score, diff)
+        self.ratings[home_code] = home_rating + shift
+        self.ratings[away_code] = away_rating - shift
+        return away_rating, home_rating, prob
+
+    def result(self, margin):
+        """Home team's result from the margin, 1 for a win, 0 for a loss and 0.5 for a tie."""
+        return 1.0 if margin > 0 else (0.0 if margin < 0 else 0.5)
+
+    def multiplier(self, margin, diff):
+        """Margin of victory multiplier, damped when the favourite wins so ratings do not run away."""
+        if not self.mov:
+            return 1.0
+        winner_diff = diff if margin > 0 else -diff
+        return math.log(abs(margin) + 1) * 2.2 / (winner_diff * 0.001 + 2.2)
+
+    def rate_games(self, game_level):
+        """Rates every game in chronological order and returns the pre-game ratings.
+
+        Args:
+        game_level (DataFrame): game level data output by bbref_scrape.parse_box_scores, needs AwayTeam,
+            HomeTeam, AwayScore, HomeScore and DateTime, may span many seasons
+
+        Returns:
+        DataFrame: indexed like game_level with GameID (if present), AwayElo, HomeElo and HomeEloProb
+        """
+
+        dates = pd.to_datetime(game_level['DateTime'])
+        order = np.argsort(dates.to_numpy(), kind='stable')
+        seasons = dates.dt.year.to_numpy()[order].tolist()
+        # Every team is coded up front so the ratings array is sized once before the loop
+        names = pd.unique(pd.concat([game_level['AwayTeam'], game_level['HomeTeam']]))
+        codes = self.add_teams(names)
+        away = codes[pd.Index(names).get_indexer(game_level['AwayTeam'])][order].tolist()
+        home = codes[pd.Index(names).get_indexer(game_level['HomeTeam'])][order].tolist()
+        margins = (game_level['HomeScore'].to_numpy(dtype=float) - game_level['AwayScore'].to_numpy(dtype=float))[order].tolist()
+
+        n_games = len(order)
+        away_elo = np.empty(n_games)
+        home_elo = np.empty(n_games)
+        home_prob = np.empty(n_games)
+
+        # Local variables keep the loop fast
+        ratings = self.ratings
+        k, home_advantage, scale, mov = self.k, self.home_advantage, self.scale, self.mov
+        for i in range(n_games):
+            if seasons[i] != self.season:
+                self.start_season(seasons[i])
+            a, h, margin = away[i], home[i], margins[i]
+            away_rating, home_rating = ratings[a], ratings[h]
+            diff = home_rating + home_advantage - away_rating
+            prob = 1 / (1 + 10**(-diff / scale))
+            outcome = 1.0 if margin > 0 else (0.0 if margin < 0 else 0.5)
+            shift = k * (outcome - prob)
+            if mov:
+                shift *= self.multiplier(margin, diff)
+            ratings[h] = home_rating + shift
+            ratings[a] = away_rating - shift
+            away_elo[i], home_elo[i], home_prob[i] = away_rating, home_rating, prob
+
+        # Put results back in the original row order
+        out = pd.DataFrame(index=game_level.index)
+        if 'GameID' in game_level.columns:
+            out['GameID'] = game_level['GameID'].to_numpy()
+        unsorted = np.empty(n_games, dtype=np.int64)
+        unsorted[order] = np.arange(n_games)
+        out['AwayElo'] = away_elo[unsorted]
+        out['HomeElo'] = home_elo[unsorted]
+        out['HomeEloProb'] = home_prob[unsorted]
+        return out
+
+
+def score_elo(game_level, ratings):
+    """Log loss and Brier score of the pre-game home win probabilities in ratings against the results in game_level."""
+    won = (game_level['HomeScore'].to_numpy(dtype=float) > game_level['AwayScore'].to_numpy(dtype=float)).astype(float)
+    prob = np.clip(ratings['HomeEloProb'].to_numpy(), 1e-12, 1 - 1e-12)
+    log_loss = -np.mean(won * np.log(prob) + (1 - won) * np.log(1 - prob))
+    brier = np.mean((prob - won)**2)
+    return {'LogLoss' : float(log_loss), 'Brier' : float(brier)}
+
+
+def tune_elo(game_level, param_grid, burn_in_seasons=1):
+    """Rates all games for every combination of parameters and scores the probabilities.
+
+    Args:
+    game_level (DataFrame): game level data spanning several seasons
+    param_grid (dict): EloRatings constructor argument to list of values
+    burn_in_seasons (int): number of initial seasons left out of the scores while ratings settle
+
+    Returns:
+    DataFrame: one row per parameter combination with LogLoss and Brier, best first
+    """
+
+    years = pd.to_datetime(game_level['DateTime']).dt.year
+    scored = (years >= years.min() + burn_in_seasons).to_numpy()
+    rows = []
+    keys = sorted(param_grid or {})
+    for values in itertools.product(*[param_grid[key] for key in keys]):
+        params = dict(zip(keys, values))
+        ratings = EloRatings(**params).rate_games(game_level)
+        row = dict(params)
+        row.update(score_elo(game_level[scored], ratings[scored]))
+        rows.append(row)
+    return pd.DataFrame(rows).sort_values('LogLoss').reset_index(drop=True)
@@ -0,0 +1,179 @@
+'''
+backtest.py
+This file is used for evaluating betting strategies against the closing odds joined on by
+clean_data.generate_odds_lookup. Every model and edge threshold is evaluated in a single pass
+using numpy broadcasting.
+'''
+
+import numpy as np
+import pandas as pd
+from src.features.market import american_odds_to_profit, no_vig
+
+MARKETS = ('moneyline', 'runline', 'total')
+
+
+def market_arrays(odds_lookup, market):
+    """Extracts the prices and results for one market from an odds lookup table.
+
+    Each market is treated as two sided. Side A is the home team for the moneyline and run line and the over
+    for totals, side B is the away team or the under. In the odds files the visiting team's row carries the
+    over price and the home team's row carries the under price.
+
+    Args:
+    odds_lookup (DataFrame): output of clean_data.generate_odds_lookup, one row per game
+    market (str): one of 'moneyline', 'runline' or 'total'
+
+    Returns:
+    dict: float arrays 'price_a', 'price_b', 'line' and 'result_a' (1 if side A won, 0 if side B won, 0.5 for a push),
+    boolean array 'valid' marking games with complete prices and 'order', the chronological ordering of the rows
+    """
+
+    if market not in MARKETS:
+        raise Exception('Market must be one of ' + ', '.join(MARKETS))
+
+    home_score = odds_lookup['HomeScore'].to_numpy(dtype=float)
+    away_score = odds_lookup['AwayScore'].to_numpy(dtype=float)
+
+    if market == 'moneyline':
+        price_a = odds_lookup['Close'].to_numpy(dtype=float)
+        price_b = odds_lookup['Close_away'].to_numpy(dtype=float)
+        line = np.zeros(len(odds_lookup))
+        margin = home_score - away_score
+    elif market == 'runline':
+        price_a = odds_lookup['Run_Odds'].to_numpy(dtype=float)
+        price_b = odds_lookup['Run_Odds_away'].to_numpy(dtype=float)
+        line = odds_lookup['Run Line'].to_numpy(dtype=float)
+        margin = home_score - away_score + line
+    else:
+        price_a = odds_lookup['Close_OU_Odds_away'].to_numpy(dtype=float)
+        price_b = odds_lookup['Close_OU_Odds'].to_numpy(dtype=float)
+        line = odds_lookup['Close OU'].to_numpy(dtype=float)
+        margin = home_score + away_score - line
+
+    result_a = np.where(margin > 0, 1.0, np.where(margin < 0, 0.0, 0.5))
+    valid = ~(np.isnan(price_a) | np.isnan(price_b) | np.isnan(margin))
+    order = np.argsort(odds_lookup['DateTime'].to_numpy(), kind='stable')
+
+    return {'price_a' : price_a, 'price_b' : price_b, 'line' : line, 'result_a' : result_a,
+            'valid' : valid, 'order' : order}
+
+
+def score_predictions_to_prob(pred_home, pred_away, market, line, scale=2.4):
+    """Converts predicted runs into a probability that side A of a market wins.
+
+    The predicted margin against the line is passed through a logistic curve. The default scale gives
+    a standard deviation of about 4.4 runs, roughly the spread of MLB run differentials and totals.
+
+    Args:
+    pred_home (array): predicted home runs, shape (n_games,) or (n_models, n_games)
+    pred_away (array): predicted away runs, same shape as pred_home
+    market (str): one of 'moneyline', 'runline' or 'total'
+    line (array): the 'line' array returned by market_arrays
+    scale (float): logistic scale in runs
+
+    Returns:
+    array: probability that side A wins with the same shape as pred_home
+    """
+
+    pred_home = np.asarray(pred_home, dtype=float)
+    pred_away = np.asarray(pred_away, dtype=float)
+    if market == 'total':
+        signal = pred_home + pred_away - line
+    else:
+        signal = pred_home - pred_away + line
+    return 1 / (1 + np.exp(-signal / scale))
+
+
+def backtest(prob_a, market, min_edge=0.0, staking='flat', stake=1.0, kelly_fraction=1.0, bankroll=100.0):
+    """Evaluates many betting strategies on one market at once.
+
+    A strategy is a model (row of prob_a) paired with a minimum edge. For each game the side with the larger
+    expected value is bet if its expected value per unit staked is above the minimum edge. All strategies are
+    evaluated together as arrays of shape (n_models, n_edges, n_games). The market's no-vig probability and the
+    model's probability edge over it are returned as well, but bets are selected on expected value.
+
+    Args:
+    prob_a (array): probability side A wins, shape (n_games,) or (n_models, n_games) in the row order of the odds lookup
+    market (dict): output of market_arrays
+    min_edge (float or array): minimum expected value per unit staked required to place a bet
+    staking (str): 'flat' to bet stake on every game or 'kelly' to bet kelly_fraction of the Kelly criterion
+        against the current bankroll
+    stake (float): amount bet per game for flat staking
+    kelly_fraction (float): multiplier on the full Kelly stake
+    bankroll (float): starting bankroll
+
+    Returns:
+    dict: 'summary' DataFrame with one row per strategy, arrays 'stakes', 'pnl' and 'equity' of shape
+    (n_models, n_edges, n_games), 'implied', the no-vig probability side A wins of shape (n_games,), and
+    'prob_edge', prob_a minus implied of shape (n_models, n_games), all in chronological order.
+    HitRate in the summary is the fraction of bets won, leaving out pushes.
+    """
+
+    if staking not in ('flat', 'kelly'):
+        raise Exception("Staking must be either 'flat' or 'kelly'")
+
+    order = market['order']
+    prob_a = np.atleast_2d(np.asarray(prob_a, dtype=float))[:, order][:, np.newaxis, :]
+    min_edge = np.atleast_1d(np.asarray(min_edge, dtype=float))
+    edges = min_edge[np.newaxis, :, np.newaxis]
+    profit_a = american_odds_to_profit(market['price_a'][order])
+    profit_b = american_odds_to_profit(market['price_b'][order])
+    result_a = market['result_a'][order]
+    valid = market['valid'][order]
+
+    # Market probability with the vig removed and the model's edge over it
+    implied, _ = no_vig(market['price_a'][order], market['price_b'][order])
+    prob_edge = prob_a[:, 0, :] - implied
+
+    # Expected value per unit staked on each side
+    ev_a = prob_a * (1 + profit_a) - 1
+    ev_b = (1 - prob_a) * (1 + profit_b) - 1
+    take_a = ev_a >= ev_b
+    ev = np.where(take_a, ev_a, ev_b)
+    profit = np.where(take_a, profit_a, profit_b)
+    bet = (ev > edges) & valid & ~np.isnan(prob_a)
+
+    # Return per unit staked on the chosen side
+    won = np.where(take_a, result_a == 1, result_a == 0)
+    pushed = result_a == 0.5
+    ret = np.where(pushed, 0.0, np.where(won, profit, -1.0))
+    ret = np.where(bet, ret, 0.0)
+
+    if staking == 'flat':
+        stakes = np.where(bet, float(stake), 0.0)
+        pnl = stakes * ret
+        equity = bankroll + np.cumsum(pnl, axis=-1)
+    else:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.clip(kelly_fraction * ev / profit, 0, 1)
+        fraction = np.where(bet, fraction, 0.0)
+        equity = bankroll * np.cumprod(1 + fraction * ret, axis=-1)
+        before = np.concatenate([np.full(equity.shape[:-1] + (1,), float(bankroll)), equity[..., :-1]], axis=-1)
+        stakes = fraction * before
+        pnl = equity - before
+
+    # Drawdown measured from the running peak, including the starting bankroll
+    peak = np.maximum(np.maximum.accumulate(equity, axis=-1), bankroll)
+    drawdown = peak - equity
+
+    n_models = prob_a.shape[0]
+    n_bets = bet.sum(axis=-1)
+    staked = stakes.sum(axis=-1)
+    total = pnl.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = np.where(staked > 0, total / staked, np.nan)
+        decided = (bet & ~pushed).sum(axis=-1)
+        hit_rate = np.where(decided > 0, (bet & won & ~pushed).sum(axis=-1) / decided, np.nan)
+    summary = pd.DataFrame({'Model' : np.repeat(np.arange(n_models), len(min_edge)),
+                            'MinEdge' : np.tile(min_edge, n_models),
+                            'Bets' : n_bets.ravel(),
+                            'HitRate' : hit_rate.ravel(),
+                            'Staked' : staked.ravel(),
+                            'Profit' : total.ravel(),
+                            'ROI' : roi.ravel(),
+                            'FinalBankroll' : equity[..., -1].ravel(),
+                            'MaxDrawdown' : drawdown.max(axis=-1).ravel(),
+                            'MaxDrawdownPct' : (drawdown / peak).max(axis=-1).ravel()})
+
+    return {'summary' : summary, 'stakes' : stakes, 'pnl' : pnl, 'equity' : equity,
+            'implied' : implied, 'prob_edge' : prob_edge}
@@ -0,0 +1,190 @@
+'''
+simulate.py
+This file is used for pricing games by Monte Carlo simulation of inning-by-inning scoring. Run
+distributions per inning are fit from the Inn1-Inn9 columns produced by bbref_scrape.parse_box_scores.
+'''
+
+import numpy as np
+import pandas as pd
+
+INNING_COLS = ['Inn' + str(i) for i in range(1, 10)]
+
+
+class InningRunModel(object):
+    """Distribution of runs scored in a half inning for every offense/defense matchup.
+
+    Each team gets an offensive and a defensive distribution over 0 to max_runs runs (max_runs means
+    that many or more), shrunk toward the league distribution. The distribution for a matchup is
+
+        P(r) ~ offense(r) * defense(r) * league_side(r) / league(r)^2
+
+    where league_side is the league distribution for home or away batting, which carries home field advantage.
+
+    Constructor takes:
+    max_runs: largest number of runs tracked in a half inning
+    prior_innings: weight (in half innings) of the league distribution when shrinking each team's distribution
+    """
+
+    def __init__(self, max_runs=10, prior_innings=200):
+        self.max_runs = max_runs
+        self.prior_innings = prior_innings
+
+    def fit(self, team_level):
+        """Fits the run distributions from team level data output by bbref_scrape.parse_box_scores.
+
+        Args:
+        team_level (DataFrame): needs Team, Opponent, HomeAway and Inn1-Inn9 columns, innings not played are NaN or 'X'
+
+        Returns:
+        InningRunModel: self
+        """
+
+        teams = pd.Index(sorted(set(team_level['Team']) | set(team_level['Opponent'])))
+        self.teams = teams
+        innings = team_level[INNING_COLS].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        offense = np.repeat(teams.get_indexer(team_level['Team']), innings.shape[1])
+        defense = np.repeat(teams.get_indexer(team_level['Opponent']), innings.shape[1])
+        home = np.repeat((team_level['HomeAway'] == 'Home').to_numpy(), innings.shape[1])
+        runs = innings.ravel()
+        played = ~np.isnan(runs)
+        runs = np.minimum(runs[played], self.max_runs).astype(int)
+        offense, defense, home = offense[played], defense[played], home[played]
+
+        n_runs = self.max_runs + 1
+        off_counts = np.zeros((len(teams), n_runs))
+        def_counts = np.zeros((len(teams), n_runs))
+        np.add.at(off_counts, (offense, runs), 1)
+        np.add.at(def_counts, (defense, runs), 1)
+        side_counts = np.zeros((2, n_runs))
+        np.add.at(side_counts, (home.astype(int), runs), 1)
+
+        # Small floor keeps every run total possible when dividing by the league distribution
+        league = (side_counts.sum(axis=0) + 0.5) / (side_counts.sum() + 0.5 * n_runs)
+        self.league = league
+        self.side = (side_counts + 0.5) / (side_counts.sum(axis=1, keepdims=True) + 0.5 * n_runs)
+        prior = self.prior_innings * league
+        self.offense = (off_counts + prior) / (off_counts.sum(axis=1, keepdims=True) + self.prior_innings)
+        self.defense = (def_counts + prior) / (def_counts.sum(axis=1, keepdims=True) + self.prior_innings)
+        return self
+
+    def matchup_pmf(self, batting, pitching, home):
+        """Returns run distributions for arrays of batting teams against pitching teams.
+
+        Args:
+        batting (array of str): batting team names
+        pitching (array of str): fielding team names
+        home (array of bool): whether the batting team is the home team
+
+        Returns:
+        array: shape (n, max_runs + 1), each row sums to one
+
+        Raises an exception if any team was not in the data the model was fit on.
+        """
+
+        batting_codes = self.teams.get_indexer(batting)
+        pitching_codes = self.teams.get_indexer(pitching)
+        # get_indexer gives -1 for teams not seen in fit, which would silently pick the last team
+        unknown = set(np.asarray(batting)[batting_codes < 0]) | set(np.asarray(pitching)[pitching_codes < 0])
+        if unknown:
+            raise Exception('Teams not seen when fitting the model: ' + ', '.join(sorted(map(str, unknown))))
+        off = self.offense[batting_codes]
+        dfn = self.defense[pitching_codes]
+        side = self.side[np.asarray(home, dtype=int)]
+        pmf = off * dfn * side / self.league**2
+        return pmf / pmf.sum(axis=1, keepdims=True)
+
+
+def sample_innings(cdf, n_sims, rng):
+    """Draws one half inning of runs for every game and simulation by inverting the cdf of shape (n_games, n_runs)."""
+    u = rng.random((cdf.shape[0], n_sims), dtype=np.float32)
+    runs = np.zeros((cdf.shape[0], n_sims), dtype=np.int16)
+    for k in range(cdf.shape[1] - 1):
+        runs += u > cdf[:, k:k + 1]
+    return runs
+
+
+def simulate_games(away_pmf, home_pmf, n_sims=10000, max_extra=30, seed=None):
+    """Simulates complete games as arrays of shape (n_games, n_sims).
+
+    The home team does not bat in the bottom of the 9th (or any extra inning) if it is already ahead, and a
+    walk-off inning stops once the home team has the lead, so walk-off runs are capped at one more than the
+    deficit. Extra innings are played until the game is decided or max_extra innings have been added;
+    games still tied after that are returned tied.
+
+    Args:
+    away_pmf (array): run distribution per half inning for the away team, shape (n_games, n_runs)
+    home_pmf (array): run distribution per half inning for the home team, shape (n_games, n_runs)
+    n_sims (int): number of simulations per game
+    max_extra (int): maximum number of extra innings
+    seed (int or Generator): seed for numpy's random generator
+
+    Returns:
+    tuple: (away_runs, home_runs, innings) integer arrays of shape (n_games, n_sims)
+    """
+
+    rng = np.random.default_rng(seed)
+    away_cdf = np.cumsum(away_pmf, axis=1, dtype=np.float32)
+    home_cdf = np.cumsum(home_pmf, axis=1, dtype=np.float32)
+    n_games = away_cdf.shape[0]
+
+    away_runs = np.zeros((n_games, n_sims), dtype=np.int16)
+    home_runs = np.zeros((n_games, n_sims), dtype=np.int16)
+    for _ in range(8):
+        away_runs += sample_innings(away_cdf, n_sims, rng)
+        home_runs += sample_innings(home_cdf, n_sims, rng)
+    innings = np.full((n_games, n_sims), 9, dtype=np.int16)
+
+    # The 9th inning and any extras, only games still in progress are updated
+    in_progress = np.ones((n_games, n_sims), dtype=bool)
+    for inning in range(9, 10 + max_extra):
+        innings[in_progress] = inning
+        away_runs += np.where(in_progress, sample_innings(away_cdf, n_sims, rng), 0).astype(np.int16)
+        bats = in_progress & (home_runs <= away_runs)
+        deficit = away_runs - home_runs
+        bottom = np.minimum(sample_innings(home_cdf, n_sims, rng), deficit + 1)
+        home_runs += np.where(bats, bottom, 0).astype(np.int16)
+        in_progress = away_runs == home_runs
+        if not in_progress.any():
+            break
+
+    return away_runs, home_runs, innings
+
+
+def price_games(model, slate, n_sims=10000, seed=None):
+    """Prices the moneyline, run line and total for every game in a slate.
+
+    Args:
+    model (InningRunModel): fitted run model
+    slate (DataFrame): one row per game with AwayTeam and HomeTeam, and optionally the home 'Run Line'
+        and total 'Close OU' to price, which default to -1.5 and 8.5
+    n_sims (int): number of simulations per game
+    seed (int): seed for numpy's random generator
+
+    Returns:
+    DataFrame: slate with simulated mean runs and win, run line and over/under probabilities appended
+    """
+
+    away = slate['AwayTeam'].to_numpy()
+    home = slate['HomeTeam'].to_numpy()
+    away_pmf = model.matchup_pmf(away, home, np.zeros(len(slate), dtype=bool))
+    home_pmf = model.matchup_pmf(home, away, np.ones(len(slate), dtype=bool))
+    away_runs, home_runs, innings = simulate_games(away_pmf, home_pmf, n_sims=n_sims, seed=seed)
+
+    run_line = (slate['Run Line'].to_numpy(dtype=float) if 'Run Line' in slate.columns
+                else np.full(len(slate), -1.5))[:, np.newaxis]
+    total_line = (slate['Close OU'].to_numpy(dtype=float) if 'Close OU' in slate.columns
+                  else np.full(len(slate), 8.5))[:, np.newaxis]
+    margin = (home_runs - away_runs).astype(float)
+    total = (home_runs + away_runs).astype(float)
+
+    out = slate.copy()
+    out['SimAwayRuns'] = away_runs.mean(axis=1)
+    out['SimHomeRuns'] = home_runs.mean(axis=1)
+    out['SimExtraInnings'] = (innings > 9).mean(axis=1)
+    out['SimHomeWin'] = (margin > 0).mean(axis=1) + 0.5 * (margin == 0).mean(axis=1)
+    out['SimAwayWin'] = 1 - out['SimHomeWin']
+    out['SimHomeCover'] = (margin + run_line > 0).mean(axis=1)
+    out['SimAwayCover'] = (margin + run_line < 0).mean(axis=1)
+    out['SimOver'] = (total > total_line).mean(axis=1)
+    out['SimUnder'] = (total < total_line).mean(axis=1)
+    return out
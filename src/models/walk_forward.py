@@ -0,0 +1,202 @@
+'''
+walk_forward.py
+This file is used for time-ordered (walk-forward) cross validation of models across dates and seasons.
+Each fold's feature slice is cached once as a memory-mapped feature matrix and model fits for every
+fold and hyperparameter combination are run in a process pool.
+'''
+
+import shutil
+import tempfile
+import itertools
+import concurrent.futures
+import numpy as np
+import pandas as pd
+from src.features import feature_matrix
+
+
+def walk_forward_folds(data, date_col='DateTime', by='date', n_folds=5, min_train_frac=0.5, gap_days=0):
+    """Generates leakage-safe walk-forward folds ordered by date.
+
+    Every row in a fold's training set comes from a strictly earlier date than every row in its test set,
+    so the two rows for a game (one per team) always land on the same side of a split.
+
+    Args:
+    data (DataFrame): rows to split, e.g. clean_data.clean_team_season_data output with game_level['DateTime']
+        merged on by GameID
+    date_col (str): datetime column used for ordering
+    by (str): 'date' to split the unique dates into n_folds test windows after an initial training window,
+        'season' to test on each season in turn while training on all earlier seasons
+    n_folds (int): number of test windows when by='date'
+    min_train_frac (float): fraction of unique dates always used for training before the first test window when by='date'
+    gap_days (int): number of days dropped from the end of each training window before the test window starts
+
+    Returns:
+    list of dict: one dict per fold with 'train' and 'test' integer positions into data and the date ranges
+    """
+
+    dates = pd.to_datetime(data[date_col]).to_numpy()
+    days = dates.astype('datetime64[D]')
+
+    if by == 'date':
+        unique_days = np.unique(days)
+        first_test = int(len(unique_days) * min_train_frac)
+        if first_test < 1 or len(unique_days) - first_test < n_folds:
+            raise Exception('Not enough distinct dates to build ' + str(n_folds) + ' folds')
+        bounds = np.linspace(first_test, len(unique_days), n_folds + 1).astype(int)
+        windows = [(unique_days[bounds[i]], unique_days[bounds[i + 1] - 1]) for i in range(n_folds)]
+    elif by == 'season':
+        years = days.astype('datetime64[Y]')
+        unique_years = np.unique(years)
+        if len(unique_years) < 2:
+            raise Exception('Need at least two seasons to split by season')
+        windows = [(days[years == year].min(), days[years == year].max()) for year in unique_years[1:]]
+    else:
+        raise Exception("Folds must be split by either 'date' or 'season'")
+
+    folds = []
+    for test_start, test_end in windows:
+        train_end = test_start - np.timedelta64(gap_days + 1, 'D')
+        train = np.flatnonzero(days <= train_end)
+        test = np.flatnonzero((days >= test_start) & (days <= test_end))
+        if len(train) == 0 or len(test) == 0:
+            continue
+        folds.append({'train' : train, 'test' : test,
+                      'TrainStart' : days[train].min(), 'TrainEnd' : days[train].max(),
+                      'TestStart' : test_start, 'TestEnd' : test_end})
+    return folds
+
+
+def parameter_grid(param_grid):
+    """Expands a dictionary of parameter lists into a list of parameter dictionaries."""
+    if not param_grid:
+        return [{}]
+    keys = sorted(param_grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*[param_grid[key] for key in keys])]
+
+
+def rmse(y_true, y_pred):
+    """Root mean squared error."""
+    return float(np.sqrt(np.mean((y_true - y_pred)**2)))
+
+
+def mae(y_true, y_pred):
+    """Mean absolute error."""
+    return float(np.mean(np.abs(y_true - y_pred)))
+
+
+DEFAULT_METRICS = {'RMSE' : rmse, 'MAE' : mae}
+
+
+def fit_fold(cache_dir, fold_num, make_model, params, metrics):
+    """Fits one model on a cached fold and scores it on the fold's test set. Run inside the worker processes."""
+    X_train, y_train, _, _ = feature_matrix.load_feature_matrix(cache_dir, 'fold' + str(fold_num) + '_train')
+    X_test, y_test, _, _ = feature_matrix.load_feature_matrix(cache_dir, 'fold' + str(fold_num) + '_test')
+
+    model = make_model(**params)
+    model.fit(X_train, y_train)
+    predictions = np.asarray(model.predict(X_test), dtype=float)
+
+    row = {'Fold' : fold_num, 'NTrain' : len(y_train), 'NTest' : len(y_test)}
+    row.update(params)
+    for name, metric in metrics.items():
+        row[name] = metric(np.asarray(y_test, dtype=float), predictions)
+    return row
+
+
+def run_walk_forward(data, features, label, make_model, param_grid=None, folds=None, metrics=None, n_jobs=None,
+                     cache_dir=None, id_col='GameID', **fold_kwargs):
+    """Fits and scores a model over every combination of walk-forward fold and hyperparameters.
+
+    Each fold's train and test slices are written once to cache_dir with feature_matrix.export_feature_matrix,
+    then every fit is run in a process pool and reads its slice back as a read-only memory map. Rows with
+    missing features or labels are dropped from each slice.
+
+    Args:
+    data (DataFrame): modeling table with a date column, see walk_forward_folds
+    features (list of str): feature columns
+    label (str): label column
+    make_model (callable): picklable callable taking hyperparameters as keyword arguments and returning an
+        object with fit(X, y) and predict(X) methods, e.g. sklearn.linear_model.Ridge
+    param_grid (dict): hyperparameter name to list of values, every combination is evaluated
+    folds (list of dict): output of walk_forward_folds, generated from fold_kwargs if not given
+    metrics (dict): metric name to callable(y_true, y_pred), defaults to RMSE and MAE
+    n_jobs (int): number of worker processes, defaults to the number of cores, 1 runs everything in this process
+    cache_dir (str): directory for the cached fold slices, a temporary directory is used and removed if not given
+    id_col (str): row identifier stored alongside each slice
+
+    Returns:
+    DataFrame: one row per fold and hyperparameter combination with the fold dates, sizes and metrics
+    """
+
+    if folds is None:
+        folds = walk_forward_folds(data, **fold_kwargs)
+    if metrics is None:
+        metrics = DEFAULT_METRICS
+    params_list = parameter_grid(param_grid)
+
+    temp_cache = cache_dir is None
+    if temp_cache:
+        cache_dir = tempfile.mkdtemp(prefix='walk_forward_')
+
+    try:
+        # Cache the feature slice for each fold once so every hyperparameter setting shares it
+        for i, fold in enumerate(folds):
+            feature_matrix.export_feature_matrix(data.iloc[fold['train']], features, label, cache_dir,
+                                                 name='fold' + str(i) + '_train', id_col=id_col)
+            feature_matrix.export_feature_matrix(data.iloc[fold['test']], features, label, cache_dir,
+                                                 name='fold' + str(i) + '_test', id_col=id_col)
+
+        tasks = [(cache_dir, i, make_model, params, metrics) for i in range(len(folds)) for params in params_list]
+        if n_jobs == 1:
+            rows = [fit_fold(*task) for task in tasks]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                futures = [executor.submit(fit_fold, *task) for task in tasks]
+                rows = [future.result() for future in futures]
+    finally:
+        if temp_cache:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    results = pd.DataFrame(rows)
+    dates = pd.DataFrame([{key : fold[key] for key in ('TrainStart', 'TrainEnd', 'TestStart', 'TestEnd')}
+                          for fold in folds])
+    dates.insert(0, 'Fold', np.arange(len(folds)))
+    results = dates.merge(results, how='right', on='Fold')
+
+    # Remember which columns are metrics and which are hyperparameters for summarize_walk_forward
+    results.attrs['metrics'] = list(metrics)
+    results.attrs['params'] = sorted(param_grid) if param_grid else []
+    return results
+
+
+def summarize_walk_forward(results, metrics=None):
+    """Averages each metric over folds for every hyperparameter combination, weighting folds by test size.
+
+    Args:
+    results (DataFrame): output of run_walk_forward
+    metrics (list of str): metric columns, defaults to the metrics run_walk_forward was called with
+
+    Returns:
+    DataFrame: one row per hyperparameter combination with the weighted mean of each metric and the total NTest
+    """
+    if metrics is None:
+        metrics = results.attrs.get('metrics', list(DEFAULT_METRICS))
+    metrics = list(metrics)
+    if 'params' in results.attrs:
+        param_cols = [col for col in results.attrs['params'] if col not in metrics]
+    else:
+        non_params = {'Fold', 'NTrain', 'NTest', 'TrainStart', 'TrainEnd', 'TestStart', 'TestEnd'} | set(metrics)
+        param_cols = [col for col in results.columns if col not in non_params]
+
+    weighted = results[metrics].multiply(results['NTest'], axis=0)
+    weighted['NTest'] = results['NTest']
+    for col in param_cols:
+        weighted[col] = results[col]
+    if not param_cols:
+        weighted['_all'] = 0
+        param_cols = ['_all']
+    grouped = weighted.groupby(param_cols, dropna=False).sum()
+    summary = grouped[metrics].divide(grouped['NTest'], axis=0)
+    summary['NTest'] = grouped['NTest']
+    summary = summary.reset_index()
+    return summary.drop(columns=['_all'], errors='ignore')
@@ -0,0 +1,77 @@
+'''
+test_backtest.py
+This file is design to be called by pytest to test backtest.py,
+the script for evaluating betting strategies against closing odds.
+'''
+
+import pandas as pd
+import numpy as np
+from src.models import backtest
+
+def make_odds_lookup():
+    '''Builds a small odds lookup table with three games out of chronological order.'''
+    return pd.DataFrame({'GameID' : [1, 2, 3],
+                            'DateTime' : pd.to_datetime(['2019-04-03', '2019-04-01', '2019-04-02']),
+                            'HomeScore' : [5, 2, 4],
+                            'AwayScore' : [3, 6, 4],
+                            'Close' : [-150, 120, 100],
+                            'Close_away' : [130, -140, -120],
+                            'Run Line' : [-1.5, 1.5, 1.5],
+                            'Run_Odds' : [110, -160, -200],
+                            'Run Line_away' : [1.5, -1.5, -1.5],
+                            'Run_Odds_away' : [-130, 140, 170],
+                            'Close OU' : [8.5, 7.0, 8.0],
+                            'Close_OU_Odds' : [-110, -110, np.nan],
+                            'Close OU_away' : [8.5, 7.0, 8.0],
+                            'Close_OU_Odds_away' : [-110, -110, np.nan]})
+
+
+def test_backtest_flat_moneyline():
+    '''Function to test flat staking across two models and two edge thresholds.'''
+    market = backtest.market_arrays(make_odds_lookup(), 'moneyline')
+    np.testing.assert_array_equal(market['order'], [1, 2, 0])
+    np.testing.assert_array_equal(market['result_a'], [1, 0, 0.5])
+
+    # Model 0 likes every home team, model 1 likes every away team
+    prob_a = np.array([[0.9, 0.9, 0.9], [0.1, 0.1, 0.1]])
+    results = backtest.backtest(prob_a, market, min_edge=[0.0, 0.5], stake=10)
+    summary = results['summary']
+
+    # Model 0, no threshold: loses game 2 (-10), pushes game 3 (0), wins game 1 at -150 (+6.667)
+    row = summary[(summary['Model'] == 0) & (summary['MinEdge'] == 0.0)].iloc[0]
+    assert(row['Bets'] == 3)
+    np.testing.assert_allclose(row['Profit'], -10 + 10 / 1.5)
+    np.testing.assert_allclose(row['MaxDrawdown'], 10)
+    np.testing.assert_allclose(results['equity'][0, 0], [90, 90, 90 + 10 / 1.5])
+
+    # Pushes are left out of the hit rate, one win in two decided bets
+    np.testing.assert_allclose(row['HitRate'], 0.5)
+
+    # No-vig market probabilities and the model's edge over them, in chronological order
+    home = np.array([100 / 220, 100 / 200, 150 / 250])
+    away = np.array([140 / 240, 120 / 220, 100 / 230])
+    np.testing.assert_allclose(results['implied'], home / (home + away))
+    np.testing.assert_allclose(results['prob_edge'], prob_a - results['implied'])
+
+    # Model 1 wins game 2 at -140 and loses game 1
+    row = summary[(summary['Model'] == 1) & (summary['MinEdge'] == 0.0)].iloc[0]
+    np.testing.assert_allclose(row['Profit'], 10 / 1.4 - 10)
+
+    # A 50% edge threshold drops model 0's bet on the -150 favourite in game 1
+    row = summary[(summary['Model'] == 0) & (summary['MinEdge'] == 0.5)].iloc[0]
+    assert(row['Bets'] == 2)
+    np.testing.assert_allclose(row['ROI'], -0.5)
+
+
+def test_backtest_kelly_total():
+    '''Function to test Kelly staking on totals and that games without prices are skipped.'''
+    odds_lookup = make_odds_lookup()
+    market = backtest.market_arrays(odds_lookup, 'total')
+    prob_a = backtest.score_predictions_to_prob([5, 5, 5], [5, 5, 5], 'total', market['line'])
+    results = backtest.backtest(prob_a, market, staking='kelly', bankroll=100)
+
+    # Both priced games are overs predicted at 10 runs, game 2 goes over 7, game 1 stays under 8.5
+    assert(results['summary']['Bets'][0] == 2)
+    assert(results['stakes'][0, 0, 1] == 0)
+    assert(results['equity'][0, 0, 0] > 100)
+    assert(results['equity'][0, 0, -1] < results['equity'][0, 0, 0])
@@ -203,3 +203,48 @@ def compare_pitching_stats(box_score):
     # Ensure the scraped away batting is correct
     pd.testing.assert_frame_equal(box_score.away_pitching, away_df)
     pd.testing.assert_frame_equal(box_score.home_pitching, home_df)
+
+
+
+BATTING_STATS = ['AB', 'R', 'H', 'RBI', 'BB', 'SO', 'PA', 'BA', 'OBP', 'SLG', 'OPS', 'Pit', 'Str', 'WPA', 'aLI', 'WPA+', 'WPA-',
+                 'RE24', 'PO', 'A']
+PITCHING_STATS = ['IP', 'H', 'R', 'ER', 'BB', 'SO', 'HR', 'ERA', 'BF', 'Pit', 'Str', 'Ctct', 'StS', 'StL', 'GB', 'FB', 'LD',
+                  'Unk', 'GSc', 'IR', 'IS', 'WPA', 'aLI', 'RE24']
+
+def make_box_score(url, away_wins):
+    '''Builds a complete box score with one player and a totals row in each batting and pitching table.'''
+    box_score = bbref_scrape.BoxScore()
+    box_score.set_score_box_info('New York Yankees', 'Baltimore Orioles', 'Saturday, June 4, 2016', '7:05 p.m. Local',
+                                 '40,000', 'Camden Yards', '3:00', '', away_wins, '1', '1', '0')
+    box_score.set_linescore(pd.DataFrame({'Team' : ['NYY', 'BAL'], '1' : [1, 2], 'R' : [1, 2], 'H' : [5, 6], 'E' : [0, 0]}))
+    for side in ('away', 'home'):
+        batting = pd.DataFrame({'Player' : ['A', 'Team Totals'], **{stat : [4, 4] for stat in BATTING_STATS}})
+        pitching = pd.DataFrame({'Player' : ['B', 'Team Totals'], **{stat : [9, 9] for stat in PITCHING_STATS}})
+        getattr(box_score, 'set_' + side + '_batting')(batting)
+        getattr(box_score, 'set_' + side + '_pitching')(pitching)
+    box_score.url = url
+    return box_score
+
+
+def test_parse_box_scores_quarantine():
+    '''Function for testing that a box score which fails part way through parsing is quarantined whole
+    while the good box scores around it are parsed into every table.'''
+
+    # Records that cannot be read as numbers only fail once the team rows are being built
+    quarantine = []
+    parsed = bbref_scrape.parse_box_scores([make_box_score('https://example/good', '2'), make_box_score('https://example/bad', 'x')],
+                                           quarantine=quarantine)
+    assert(len(quarantine) == 1)
+    assert(quarantine[0]['URL'] == 'https://example/bad' and quarantine[0]['Stage'] == 'parse')
+    assert('ValueError' in quarantine[0]['Error'])
+
+    assert(list(parsed['Game']['URL']) == ['https://example/good'])
+    game_id = parsed['Game']['GameID'][0]
+    assert(list(parsed['Team']['HomeAway']) == ['Away', 'Home'] and list(parsed['Team']['GameNum']) == [3, 1])
+    assert(list(parsed['Team']['Opponent']) == ['Baltimore Orioles', 'New York Yankees'])
+    assert(list(parsed['Batter']['Team']) == ['New York Yankees', 'Baltimore Orioles'])
+    assert(list(parsed['Pitcher']['Starter']) == ['B', 'B'])
+    for key in ('Team', 'Batter', 'Pitcher'):
+        assert((parsed[key]['GameID'] == game_id).all())
+    np.testing.assert_array_equal(parsed['Innings'].game_ids, [game_id, game_id])
+    np.testing.assert_array_equal(parsed['Innings'].runs_between(), [1, 2])
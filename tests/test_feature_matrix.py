@@ -0,0 +1,31 @@
+'''
+test_feature_matrix.py
+This file is design to be called by pytest to test feature_matrix.py,
+the script for exporting model data to memory-mapped arrays.
+'''
+
+import pandas as pd
+import numpy as np
+from src.features import feature_matrix
+
+def test_export_and_load_feature_matrix(tmp_path):
+    '''Function for testing that an exported feature matrix round trips and drops incomplete rows.'''
+
+    model_data = pd.DataFrame({'GameID' : [11, 12, 13, 14],
+                                'Runs_Mean' : [4.5, np.nan, 3.25, 5.0],
+                                'OBP_Mean' : [0.31, 0.30, 0.29, 0.35],
+                                'Runs' : [3, 7, 2, 6],
+                                'Team' : ['NYY', 'BAL', 'NYY', 'BAL']})
+
+    meta = feature_matrix.export_feature_matrix(model_data, ['Runs_Mean', 'OBP_Mean'], 'Runs', str(tmp_path), name='train')
+    assert(meta['n_rows'] == 3)
+
+    X, y, ids, meta = feature_matrix.load_feature_matrix(str(tmp_path), name='train')
+    assert(isinstance(X, np.memmap))
+    assert(X.dtype == np.float32)
+    np.testing.assert_array_equal(ids, [11, 13, 14])
+    np.testing.assert_allclose(X, np.array([[4.5, 0.31], [3.25, 0.29], [5.0, 0.35]], dtype=np.float32))
+    np.testing.assert_array_equal(y, np.array([3, 2, 6], dtype=np.float32))
+
+    df = feature_matrix.feature_matrix_to_frame(X, ids, meta)
+    assert(list(df.columns) == ['GameID', 'Runs_Mean', 'OBP_Mean'])
@@ -0,0 +1,61 @@
+'''
+test_innings.py
+This file is design to be called by pytest to test innings.py,
+the ragged store of inning-by-inning runs.
+'''
+
+import pandas as pd
+import numpy as np
+from src.data import innings
+
+def make_store():
+    '''Builds a store from a nine inning game with an unplayed bottom 9th and an eleven inning game.'''
+    regulation = pd.DataFrame({'Team' : ['New York Yankees', 'Baltimore Orioles'],
+                                '1' : [0, 2], '2' : [0, 0], '3' : [1, 0], '4' : [4, 0], '5' : [1, 0],
+                                '6' : [0, 1], '7' : [0, 3], '8' : [0, 0], '9' : [0, np.nan],
+                                'R' : [6, 6], 'H' : [10, 8], 'E' : [0, 1]})
+    extras = pd.DataFrame({'Team' : ['Boston Red Sox', 'Tampa Bay Rays'],
+                            '1' : [1, 0], '2' : [0, 0], '3' : [0, 0], '4' : [0, 1], '5' : [0, 0], '6' : [0, 0],
+                            '7' : [0, 0], '8' : [0, 0], '9' : [0, 0], '10' : [0, 0], '11' : [2, 'X'],
+                            'R' : [3, 1], 'H' : [7, 5], 'E' : [0, 0]})
+    return innings.InningStore.from_linescores([101, 102], [regulation, extras])
+
+
+def test_store_keeps_extra_innings():
+    '''Function to test that innings of every game are kept along with the unplayed innings.'''
+    store = make_store()
+    assert(len(store) == 4)
+    np.testing.assert_array_equal(store.lengths, [9, 9, 11, 11])
+    np.testing.assert_array_equal(store.innings_played(), [9, 8, 11, 10])
+    np.testing.assert_array_equal(store.runs_between(), [6, 6, 3, 1])
+
+
+def test_partial_game_queries():
+    '''Function to test first five, late inning and single inning queries.'''
+    store = make_store()
+    np.testing.assert_array_equal(store.runs_between(1, 5), [6, 2, 1, 1])
+    np.testing.assert_array_equal(store.runs_between(7), [0, 3, 2, 0])
+    np.testing.assert_array_equal(store.runs_between(10), [0, 0, 2, 0])
+    np.testing.assert_array_equal(store.scored_in(1), [False, True, True, False])
+    np.testing.assert_array_equal(store.inning_runs(9), [0, np.nan, 0, 0])
+    np.testing.assert_array_equal(store.inning_runs(11), [np.nan, np.nan, 2, np.nan])
+
+    first_five = store.game_table(1, 5)
+    assert(list(first_five['GameID']) == [101, 102])
+    assert(list(first_five['AwayRuns']) == [6, 1])
+    assert(list(first_five['HomeRuns']) == [2, 1])
+
+    wide = store.to_wide()
+    assert(list(wide.columns[-9:]) == ['Inn' + str(i) for i in range(1, 10)])
+
+
+def test_save_and_load(tmp_path):
+    '''Function to test the store round trips through an npz file.'''
+    store = make_store()
+    path = str(tmp_path / 'innings.npz')
+    store.save(path)
+    loaded = innings.InningStore.load(path)
+    np.testing.assert_array_equal(loaded.values, store.values)
+    np.testing.assert_array_equal(loaded.missing, store.missing)
+    np.testing.assert_array_equal(loaded.runs_between(1, 5), store.runs_between(1, 5))
+    assert(list(loaded.teams) == list(store.teams))
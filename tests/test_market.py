@@ -0,0 +1,70 @@
+'''
+test_market.py
+This file is design to be called by pytest to test market.py,
+the script for computing market-implied probabilities from the odds files.
+'''
+
+import os
+import pandas as pd
+import numpy as np
+from src.features import market
+from src.data.clean_data import TEAM_ABBRV
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+def test_odds_conversions():
+    '''Function to test conversion from American odds and vig removal.'''
+    np.testing.assert_allclose(market.american_odds_to_profit([150, -200]), [1.5, 0.5])
+    np.testing.assert_allclose(market.implied_probability([100, -300]), [0.5, 0.75])
+    prob, vig = market.no_vig(-110, -110)
+    np.testing.assert_allclose([prob, vig], [0.5, 2 * 110 / 210 - 1], rtol=1e-6)
+
+
+def test_build_market_features():
+    '''Function to test the market table built from the 2017-2019 odds files.'''
+    odds = {season : pd.read_csv(os.path.join(DATA_DIR, 'mlbodds' + str(season) + '.csv')) for season in (2017, 2018, 2019)}
+    features = market.build_market_features(odds)
+    assert(len(features) == sum(len(df) for df in odds.values()) // 2)
+    assert(features['HomeWinProbClose'].dtype == np.float32)
+
+    # First game of 2017: SFO (-144) at ARI (+129), total 8.5 with the over at -120 and the under at +100
+    first = features.iloc[0]
+    assert((first['Season'], first['Date'], first['AwayTeam'], first['HomeTeam']) == (2017, 402, 'SFO', 'ARI'))
+    home, away = 100 / 229, 144 / 244
+    np.testing.assert_allclose(first['HomeWinProbClose'], home / (home + away), rtol=1e-6)
+    np.testing.assert_allclose(first['OverProbClose'], (120 / 220) / (120 / 220 + 0.5), rtol=1e-6)
+    np.testing.assert_allclose(first['TotalMove'], 0.5)
+
+    # Probabilities without the vig are complementary and the vig is positive
+    valid = features['HomeWinProbClose'].notna()
+    assert(features.loc[valid, 'HomeWinProbClose'].between(0, 1).all())
+    assert((features.loc[valid, 'MLVigClose'] > 0).mean() > 0.99)
+
+    # Aliases like LOS for the Dodgers in 2017 are mapped so every team matches the game level abbreviations
+    teams = set(TEAM_ABBRV.values())
+    assert(set(features['AwayTeam'].astype(str)).issubset(teams) and set(features['HomeTeam'].astype(str)).issubset(teams))
+
+    # The 'NL' opening lines in 2019 are missing rather than an error
+    assert(features.loc[features['Season'] == 2019, 'HomeWinProbOpen'].isna().any())
+
+
+def test_join_market_features():
+    '''Function to test joining onto game level data including a doubleheader.'''
+    odds = pd.DataFrame({'Date' : [701, 701, 701, 701], 'Rot' : [901, 902, 951, 952], 'VH' : ['V', 'H', 'V', 'H'],
+                            'Team' : ['NYY', 'BAL', 'NYY', 'BAL'], 'Final' : [3, 4, 6, 1],
+                            'Open' : [-120, 110, 105, -115], 'Close' : [-130, 120, 100, -110],
+                            'Run Line' : [-1.5, 1.5, 1.5, -1.5], 'Unnamed: 18' : [120, -140, -180, 160],
+                            'Open OU' : [8, 8, 9, 9], 'Unnamed: 20' : [-110, -110, -105, -115],
+                            'Close OU' : [8.5, 8.5, 9, 9], 'Unnamed: 22' : [-115, -105, -110, -110]})
+    features = market.build_market_features({2019 : odds})
+    np.testing.assert_array_equal(features['DayGame'], [0, 1])
+
+    # The third game has a team name the odds data does not know about
+    game_level = pd.DataFrame({'GameID' : [2, 1, 3],
+                                'AwayTeam' : ['New York Yankees', 'New York Yankees', 'Cleveland Guardians'],
+                                'HomeTeam' : ['Baltimore Orioles', 'Baltimore Orioles', 'Detroit Tigers'],
+                                'DateTime' : pd.to_datetime(['2019-07-01 19:05', '2019-07-01 13:05', '2019-07-01 13:10'])})
+    joined = market.join_market_features(game_level, features)
+    assert(list(joined['GameID']) == [2, 1, 3])
+    np.testing.assert_array_equal(joined['AwayScore_odds'], [6, 3, np.nan])
+    np.testing.assert_allclose(joined['HomeRunLine'], [-1.5, 1.5, np.nan])
@@ -0,0 +1,49 @@
+'''
+test_ratings.py
+This file is design to be called by pytest to test ratings.py,
+the script for computing Elo-style team ratings.
+'''
+
+import pandas as pd
+import numpy as np
+from src.features import ratings
+
+def make_games():
+    '''Three games out of order across two seasons.'''
+    return pd.DataFrame({'GameID' : [3, 1, 2],
+                            'AwayTeam' : ['New York Yankees', 'New York Yankees', 'Baltimore Orioles'],
+                            'HomeTeam' : ['Baltimore Orioles', 'Baltimore Orioles', 'New York Yankees'],
+                            'AwayScore' : [2, 5, 0],
+                            'HomeScore' : [3, 4, 1],
+                            'DateTime' : pd.to_datetime(['2019-04-01', '2018-04-01', '2018-04-02'])})
+
+
+def test_rate_games_matches_sequential_updates():
+    '''Function to test the batch pass against one update at a time, including regression between seasons.'''
+    games = make_games()
+    batch = ratings.EloRatings(k=20, revert=0.5).rate_games(games)
+
+    elo = ratings.EloRatings(k=20, revert=0.5)
+    expected = {}
+    for row in games.sort_values('DateTime').itertuples():
+        expected[row.GameID] = elo.update(row.AwayTeam, row.HomeTeam, row.AwayScore, row.HomeScore, row.DateTime.year)
+
+    for row in batch.itertuples():
+        np.testing.assert_allclose((row.AwayElo, row.HomeElo, row.HomeEloProb), expected[row.GameID])
+
+    # First game is rated at the mean, the home team gets home field advantage
+    first = batch[batch['GameID'] == 1].iloc[0]
+    assert(first['AwayElo'] == first['HomeElo'] == 1500)
+    assert(first['HomeEloProb'] > 0.5)
+
+    # Yankees won both 2018 games, half of their lead is kept into 2019
+    third = batch[batch['GameID'] == 3].iloc[0]
+    assert(third['AwayElo'] > 1500 > third['HomeElo'])
+    np.testing.assert_allclose(third['AwayElo'] - 1500, 1500 - third['HomeElo'])
+
+
+def test_tune_elo():
+    '''Function to test the parameter grid search.'''
+    results = ratings.tune_elo(make_games(), {'k' : [4, 20], 'mov' : [False, True]})
+    assert(len(results) == 4)
+    assert(results['LogLoss'].is_monotonic_increasing)
@@ -0,0 +1,60 @@
+'''
+test_simulate.py
+This file is design to be called by pytest to test simulate.py,
+the script for Monte Carlo simulation of games.
+'''
+
+import pytest
+import pandas as pd
+import numpy as np
+from src.models import simulate
+
+def test_simulate_games_rules():
+    '''Function to test the bottom of the 9th and extra inning rules with deterministic innings.'''
+
+    # Home scores 2 every inning and away scores 1, so home never bats in the 9th
+    away_pmf = np.array([[0, 1, 0]])
+    home_pmf = np.array([[0, 0, 1]])
+    away_runs, home_runs, innings = simulate.simulate_games(away_pmf, home_pmf, n_sims=5, seed=0)
+    assert((away_runs == 9).all() and (home_runs == 16).all() and (innings == 9).all())
+
+    # Nobody scores, so the game goes the maximum number of extra innings
+    zero = np.array([[1, 0, 0]])
+    away_runs, home_runs, innings = simulate.simulate_games(zero, zero, n_sims=5, max_extra=3, seed=0)
+    assert((away_runs == 0).all() and (home_runs == 0).all() and (innings == 12).all())
+
+    # Walk-off innings stop once the home team leads
+    pmf = np.array([[0.6, 0.2, 0.1, 0.1]])
+    away_runs, home_runs, innings = simulate.simulate_games(pmf, pmf, n_sims=20000, seed=1)
+    extra = innings > 9
+    assert(extra.any())
+    margin = home_runs[extra] - away_runs[extra]
+    assert((margin[margin > 0] == 1).all())
+
+
+def test_price_games():
+    '''Function to test fitting the inning model and pricing a slate.'''
+    rng = np.random.default_rng(0)
+    rows = []
+    for game in range(200):
+        for team, opponent, home_away, mean in [('NYY', 'BAL', 'Away', 0.8), ('BAL', 'NYY', 'Home', 0.3)]:
+            row = {'Team' : team, 'Opponent' : opponent, 'HomeAway' : home_away}
+            row.update({col : rng.poisson(mean) for col in simulate.INNING_COLS})
+            rows.append(row)
+    team_level = pd.DataFrame(rows)
+    team_level['Inn9'] = team_level['Inn9'].astype(object)
+    team_level.loc[1, 'Inn9'] = 'X'
+
+    model = simulate.InningRunModel().fit(team_level)
+    np.testing.assert_allclose(model.matchup_pmf(['NYY'], ['BAL'], [False]).sum(), 1)
+
+    slate = pd.DataFrame({'AwayTeam' : ['NYY'], 'HomeTeam' : ['BAL'], 'Run Line' : [1.5], 'Close OU' : [9.5]})
+    prices = simulate.price_games(model, slate, n_sims=20000, seed=0)
+    assert(prices['SimAwayWin'][0] > 0.8)
+    assert(prices['SimAwayRuns'][0] > prices['SimHomeRuns'][0])
+    np.testing.assert_allclose(prices['SimOver'][0] + prices['SimUnder'][0], 1)
+    assert(prices['SimAwayCover'][0] < prices['SimAwayWin'][0])
+
+    # A team the model was not fit on is an error rather than being priced as some other team
+    with pytest.raises(Exception, match='ZZZ'):
+        simulate.price_games(model, pd.DataFrame({'AwayTeam' : ['ZZZ'], 'HomeTeam' : ['BAL']}), n_sims=10, seed=0)
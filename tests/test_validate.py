@@ -0,0 +1,116 @@
+'''
+test_validate.py
+This file is design to be called by pytest to test validate.py,
+the script for consistency checks on parsed box scores.
+'''
+
+import pandas as pd
+import numpy as np
+from src.data import validate
+from src.data import innings
+from src.data import bbref_scrape
+
+def make_parsed():
+    '''Three games between the same two teams, all consistent.'''
+    scores = [(3, 2), (1, 4), (5, 6)]
+    game_rows, team_rows, batter_rows, linescores = [], [], [], []
+    records = {'NYY' : [10, 10], 'BAL' : [12, 8]}
+    for game_id, (away_runs, home_runs) in enumerate(scores, start=1):
+        game_rows.append({'GameID' : game_id, 'AwayTeam' : 'NYY', 'HomeTeam' : 'BAL',
+                            'DateTime' : pd.Timestamp(2019, 5, game_id), 'AwayScore' : away_runs, 'HomeScore' : home_runs,
+                            'URL' : 'https://example/' + str(game_id)})
+        linescore = {'Team' : ['NYY', 'BAL']}
+        for inning in range(1, 10):
+            linescore[str(inning)] = [away_runs if inning == 1 else 0, home_runs if inning == 2 else 0]
+        linescore.update({'R' : [away_runs, home_runs], 'H' : [8, 8], 'E' : [0, 0]})
+        linescores.append(pd.DataFrame(linescore))
+        for team, home_away, runs, opp_runs in [('NYY', 'Away', away_runs, home_runs), ('BAL', 'Home', home_runs, away_runs)]:
+            records[team][0 if runs > opp_runs else 1] += 1
+            team_rows.append({'GameID' : game_id, 'Team' : team, 'HomeAway' : home_away, 'Wins' : str(records[team][0]),
+                                'Losses' : str(records[team][1]), 'Runs' : runs, 'AB' : 33, 'R' : runs, 'RBI' : runs,
+                                'BB' : 3, 'SO' : 8, 'PA' : 37,
+                                **{'Inn' + str(i) : linescore[str(i)][0 if home_away == 'Away' else 1] for i in range(1, 10)}})
+            for player in range(3):
+                batter_rows.append({'GameID' : game_id, 'Team' : team, 'HomeAway' : home_away, 'AB' : 11,
+                                    'R' : runs if player == 0 else 0, 'RBI' : runs if player == 1 else 0, 'BB' : 1,
+                                    'SO' : [2, 3, 3][player], 'PA' : [12, 12, 13][player]})
+            batter_rows.append({'GameID' : game_id, 'Team' : team, 'HomeAway' : home_away, 'AB' : np.nan,
+                                'R' : np.nan, 'RBI' : np.nan, 'BB' : np.nan, 'SO' : np.nan, 'PA' : np.nan})
+    return {'Game' : pd.DataFrame(game_rows), 'Team' : pd.DataFrame(team_rows), 'Batter' : pd.DataFrame(batter_rows),
+            'Pitcher' : pd.DataFrame({'GameID' : [1, 2, 3]}),
+            'Innings' : innings.InningStore.from_linescores([1, 2, 3], linescores)}
+
+
+def test_consistent_games_pass():
+    '''Function to test that consistent games are not quarantined.'''
+    clean, quarantine = validate.validate_parsed(make_parsed())
+    assert(len(quarantine) == 0)
+    assert(len(clean['Game']) == 3 and len(clean['Innings']) == 6)
+
+
+def test_inconsistent_games_are_quarantined():
+    '''Function to test each check quarantines the game it fails on and leaves the rest.'''
+    parsed = make_parsed()
+    team_level = parsed['Team']
+    team_level.loc[(team_level['GameID'] == 1) & (team_level['HomeAway'] == 'Home'), 'PA'] = 36
+    team_level.loc[(team_level['GameID'] == 2) & (team_level['HomeAway'] == 'Away'), 'Losses'] = '13'
+    parsed['Innings'].values[parsed['Innings'].offsets[4]] = 4
+    parsed['Innings'] = innings.InningStore(*[getattr(parsed['Innings'], name) for name in
+                                              ('game_ids', 'teams', 'home', 'offsets', 'values', 'missing')])
+
+    clean, quarantine = validate.validate_parsed(parsed)
+    checks = set(zip(quarantine['GameID'], quarantine['Check']))
+    assert(checks == {(1, 'batting_totals'), (2, 'record_sequence'), (3, 'linescore_runs')})
+    assert(quarantine.loc[quarantine['Check'] == 'record_sequence', 'Detail'].iloc[0] ==
+           'NYY record 11-13 after a loss does not fit between 11-10 and 11-12')
+    assert(quarantine.loc[quarantine['Check'] == 'batting_totals', 'Detail'].iloc[0] == 'PA 36.0 != 37.0')
+    assert(quarantine.loc[quarantine['GameID'] == 3, 'URL'].iloc[0] == 'https://example/3')
+    assert(len(clean['Game']) == 0 and len(clean['Innings']) == 0)
+
+
+def test_records_with_unscraped_games():
+    '''Function to test that records skipping games nobody scraped are not flagged but impossible steps are.'''
+    games = pd.DataFrame({'GameID' : [1, 2, 3, 4],
+                          'DateTime' : pd.to_datetime(['2019-05-01', '2019-05-05', '2019-05-09', '2019-05-10'])})
+    # Only NYY was scraped: it plays BAL, BOS, BAL and then BOS again
+    teams = pd.DataFrame({'GameID' : [1, 1, 2, 2, 3, 3, 4, 4],
+                          'HomeAway' : ['Away', 'Home'] * 4,
+                          'Team' : ['NYY', 'BAL', 'NYY', 'BOS', 'NYY', 'BAL', 'NYY', 'BOS'],
+                          'Wins' : ['1', '0', '2', '3', '3', '4', '3', '5'],
+                          'Losses' : ['0', '1', '0', '3', '0', '5', '1', '3'],
+                          'Runs' : [5, 2, 4, 1, 6, 3, 2, 7]})
+    assert(len(validate.check_records(teams, games)) == 0)
+
+    # BOS going from 3-3 to 5-3 is fine in two games, but the same step over one game is not
+    teams.loc[7, 'Wins'] = '4'
+    teams.loc[7, 'Losses'] = '4'
+    assert(len(validate.check_records(teams, games)) == 0)
+    teams.loc[7, 'Losses'] = '2'
+    flagged = validate.check_records(teams, games)
+    assert(list(zip(flagged['GameID'], flagged['HomeAway'])) == [(4, 'Home')])
+
+    # A bad second record is blamed on its own game and leaves the season opener before it alone
+    parsed = make_parsed()
+    team_level = parsed['Team']
+    team_level.loc[(team_level['GameID'] == 2) & (team_level['HomeAway'] == 'Away'), 'Wins'] = '10'
+    flagged = validate.check_records(team_level, parsed['Game'])
+    assert(list(zip(flagged['GameID'], flagged['HomeAway'])) == [(2, 'Away')])
+
+
+def test_empty_batch():
+    '''Function to test that a batch with no parsed games gives an empty quarantine.'''
+    clean, quarantine = validate.validate_parsed(bbref_scrape.parse_box_scores([]))
+    assert(len(quarantine) == 0 and 'Check' in quarantine.columns)
+    assert(len(clean['Game']) == 0 and len(clean['Innings']) == 0)
+
+
+def test_subset_innings_and_check_box_score():
+    '''Function to test the inning store subset and the pre-parse box score check.'''
+    store = make_parsed()['Innings']
+    kept = store.subset(store.game_ids != 2)
+    np.testing.assert_array_equal(kept.game_ids, [1, 1, 3, 3])
+    np.testing.assert_array_equal(kept.runs_between(), [3, 2, 5, 6])
+
+    class Empty(object):
+        pass
+    assert('missing linescore' in validate.check_box_score(Empty()))
@@ -0,0 +1,69 @@
+'''
+test_walk_forward.py
+This file is design to be called by pytest to test walk_forward.py,
+the script for walk-forward cross validation.
+'''
+
+import pandas as pd
+import numpy as np
+from src.models import walk_forward
+
+class MeanModel(object):
+    '''Predicts the training mean scaled by a shrinkage parameter.'''
+
+    def __init__(self, shrink=1.0):
+        self.shrink = shrink
+
+    def fit(self, X, y):
+        self.mean = float(np.mean(y)) * self.shrink
+
+    def predict(self, X):
+        return np.full(len(X), self.mean)
+
+
+def make_data():
+    '''Two rows per day (one per team) over two seasons.'''
+    dates = list(pd.date_range('2018-04-01', periods=20)) + list(pd.date_range('2019-04-01', periods=20))
+    return pd.DataFrame({'GameID' : np.repeat(np.arange(40), 2),
+                            'DateTime' : np.repeat(dates, 2),
+                            'Runs_Mean' : np.linspace(3, 6, 80),
+                            'Runs' : np.tile([4, 5], 40)})
+
+
+def test_walk_forward_folds_are_time_ordered():
+    '''Function to test that no training row is on or after its fold's test start.'''
+    data = make_data()
+    folds = walk_forward.walk_forward_folds(data, n_folds=4, gap_days=1)
+    assert(len(folds) == 4)
+    for fold in folds:
+        assert(data['DateTime'].iloc[fold['train']].max() < data['DateTime'].iloc[fold['test']].min() - pd.Timedelta(days=1))
+        assert(set(data['GameID'].iloc[fold['train']]).isdisjoint(data['GameID'].iloc[fold['test']]))
+
+    folds = walk_forward.walk_forward_folds(data, by='season')
+    assert(len(folds) == 1)
+    assert(len(folds[0]['train']) == 40 and len(folds[0]['test']) == 40)
+
+
+def test_run_walk_forward():
+    '''Function to test running a parameter grid over folds in a process pool.'''
+    data = make_data()
+    results = walk_forward.run_walk_forward(data, ['Runs_Mean'], 'Runs', MeanModel, param_grid={'shrink' : [1.0, 0.0]},
+                                            n_jobs=2, n_folds=2)
+    assert(len(results) == 4)
+    np.testing.assert_allclose(results.loc[results['shrink'] == 1.0, 'MAE'], 0.5)
+    np.testing.assert_allclose(results.loc[results['shrink'] == 0.0, 'MAE'], 4.5)
+
+    summary = walk_forward.summarize_walk_forward(results)
+    assert(list(summary['shrink']) == [0.0, 1.0])
+    np.testing.assert_allclose(summary['RMSE'], [np.sqrt(20.5), 0.5])
+
+
+def test_summarize_custom_metrics():
+    '''Function to test that custom metrics are summarized as metrics rather than grouped on as parameters.'''
+    data = make_data()
+    bias = lambda y_true, y_pred: float(np.mean(y_pred - y_true))
+    results = walk_forward.run_walk_forward(data, ['Runs_Mean'], 'Runs', MeanModel, param_grid={'shrink' : [1.0, 0.0]},
+                                            metrics={'Bias' : bias}, n_jobs=1, n_folds=2)
+    summary = walk_forward.summarize_walk_forward(results)
+    assert(list(summary.columns) == ['shrink', 'Bias', 'NTest'])
+    np.testing.assert_allclose(summary['Bias'], [-4.5, 0])